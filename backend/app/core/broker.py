@@ -0,0 +1,158 @@
+import asyncio
+import json
+import logging
+from abc import ABC, abstractmethod
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class Subscription:
+    """Bounded queue of events for one subscriber; the oldest event is dropped when a slow client falls behind."""
+
+    def __init__(self, maxsize: int):
+        self._queue: "asyncio.Queue[dict]" = asyncio.Queue(maxsize=maxsize)
+
+    def put(self, event: dict):
+        if self._queue.full():
+            self._queue.get_nowait()
+        self._queue.put_nowait(event)
+
+    async def get(self) -> dict:
+        return await self._queue.get()
+
+
+class Broker(ABC):
+    """Publish/subscribe interface for real-time events.
+
+    publish() delivers an event to every subscriber of a channel, whichever
+    worker process they are connected to; subscribe() yields a Subscription
+    for the lifetime of the context.
+    """
+
+    async def start(self):
+        pass
+
+    async def close(self):
+        pass
+
+    @abstractmethod
+    async def publish(self, channel: str, event: dict):
+        ...
+
+    @abstractmethod
+    def subscribe(self, channel: str):
+        ...
+
+
+class InMemoryBroker(Broker):
+    """Single-process broker: only reaches subscribers connected to the same worker."""
+
+    def __init__(self, queue_size: int = 100):
+        self.queue_size = queue_size
+        self._channels: "dict[str, set[Subscription]]" = {}
+
+    def deliver(self, channel: str, event: dict):
+        for subscription in self._channels.get(channel, ()):
+            subscription.put(event)
+
+    async def publish(self, channel: str, event: dict):
+        self.deliver(channel, event)
+
+    @asynccontextmanager
+    async def subscribe(self, channel: str) -> AsyncIterator[Subscription]:
+        subscription = Subscription(self.queue_size)
+        self._channels.setdefault(channel, set()).add(subscription)
+        try:
+            yield subscription
+        finally:
+            subscribers = self._channels.get(channel)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._channels[channel]
+
+
+class RedisBroker(InMemoryBroker):
+    """Fans events out across workers through Redis pub/sub.
+
+    Each process keeps one pattern subscription on the server and hands
+    incoming events to its local subscribers, so publishing costs one
+    PUBLISH however many sockets are open. Works with any server speaking
+    the Redis protocol (Redis, Valkey, KeyDB). Requires the redis package.
+    """
+
+    def __init__(self, url: str, prefix: str = "ahh:", queue_size: int = 100, client=None):
+        super().__init__(queue_size)
+        if client is None:
+            try:
+                from redis import asyncio as redis_asyncio
+            except ImportError as error:
+                raise RuntimeError("BROKER_URL is set but the redis package is not installed") from error
+            client = redis_asyncio.from_url(url)
+        self.prefix = prefix
+        self.client = client
+        self._listener: Optional[asyncio.Task] = None
+
+    async def start(self):
+        self._listener = asyncio.create_task(self._listen())
+
+    async def _listen(self):
+        while True:
+            pubsub = self.client.pubsub()
+            try:
+                await pubsub.psubscribe(f"{self.prefix}*")
+                async for message in pubsub.listen():
+                    if message.get("type") != "pmessage":
+                        continue
+                    channel = message["channel"]
+                    if isinstance(channel, bytes):
+                        channel = channel.decode()
+                    try:
+                        self.deliver(channel[len(self.prefix):], json.loads(message["data"]))
+                    except ValueError:
+                        logger.warning("Dropping malformed broker event on %s", channel)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                # Events published while disconnected are lost; clients resync over HTTP
+                logger.exception("Broker subscription failed, reconnecting")
+                await asyncio.sleep(1)
+            finally:
+                await pubsub.aclose()
+
+    async def close(self):
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+        await self.client.aclose()
+
+    async def publish(self, channel: str, event: dict):
+        await self.client.publish(f"{self.prefix}{channel}", json.dumps(event, default=str))
+
+
+def make_broker(url: Optional[str], queue_size: int = 100) -> Broker:
+    if url:
+        return RedisBroker(url, queue_size=queue_size)
+    return InMemoryBroker(queue_size)
+
+
+def user_channel(user_id: int) -> str:
+    return f"user:{user_id}"
+
+
+async def notify_users(user_ids, event: dict):
+    """Publish event to each user's channel; delivery is best effort and never fails the caller."""
+    for user_id in set(user_ids):
+        try:
+            await broker.publish(user_channel(user_id), event)
+        except Exception:
+            logger.exception("Could not publish %s event to user %s", event.get("type"), user_id)
+
+
+broker = make_broker(settings.broker_url, settings.broker_queue_size)
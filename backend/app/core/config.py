@@ -1,10 +1,39 @@
+from typing import Optional
 from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
     database_url: str
+    database_replica_url: Optional[str] = None  # read-only handlers use this when set
+    read_your_writes_window: int = 5  # seconds a user's reads stay on the primary after they write
     jwt_secret: str
     jwt_algorithm: str = "HS256"
     jwt_expiration: int = 3600  # 1 hour in seconds
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_timeout: int = 30  # seconds to wait for a free connection before erroring
+    db_pool_recycle: int = -1  # seconds before a connection is replaced, -1 disables
+    db_pool_pre_ping: bool = False
+    db_pgbouncer: bool = False  # PgBouncer transaction pooling: no app-side pool, no named prepared statements
+    principal_cache_size: int = 10000  # max cached users/tokens, 0 disables the cache
+    principal_cache_ttl: int = 60  # seconds before a cached user is reloaded
+    bcrypt_rounds: int = 12  # existing hashes are upgraded on next login when this changes
+    password_hash_workers: int = 4
+    password_hash_use_processes: bool = False  # hash in worker processes instead of threads
+    password_hash_max_pending: int = 64  # queued hashing jobs before login/signup return 503
+    bulk_import_max_rows: int = 10000  # rows accepted per bulk import upload
+    metrics_cache_ttl: int = 10  # seconds the admin dashboard counts may lag behind, 0 disables
+    metrics_counters: bool = False  # keep dashboard counts in platform_counters instead of aggregating per refresh
+    broker_url: Optional[str] = None  # redis:// URL so WebSocket events reach every worker; unset = this process only
+    shared_store_url: Optional[str] = None  # redis:// URL for caches and counters shared by every worker; defaults to broker_url
+    broker_queue_size: int = 100  # events buffered per WebSocket before the oldest are dropped
+    message_retention_days: int = 365  # read messages older than this are moved to message_archive, 0 keeps everything
+    message_archive_batch_size: int = 1000  # messages moved per transaction by the archival job
+    message_partition_months_ahead: int = 3  # monthly messages partitions created in advance on PostgreSQL
+    user_search_index_ttl: int = 300  # seconds before the in-process user search index (SQLite) is rebuilt
+    catalog_cache_max_age: int = 60  # seconds browsers and the edge may reuse program/category/resource GETs, 0 = always revalidate
+    catalog_cache_stale_while_revalidate: int = 300  # seconds a stale catalog response may be served while revalidating
+    response_cache_size: int = 1000  # cached catalog responses per worker, 0 disables the response cache
+    response_cache_ttl: int = 60  # seconds a cached response is served; writes through the API evict it sooner
 
     class Config:
         env_file = ".env"
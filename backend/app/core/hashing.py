@@ -0,0 +1,78 @@
+import asyncio
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Optional
+from passlib.context import CryptContext
+from .config import settings
+
+# Kept free of database imports so process pool workers start cheaply
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=settings.bcrypt_rounds)
+
+
+class HashingOverloaded(Exception):
+    """Raised when too many password hashing jobs are already queued."""
+
+
+def hash_password(password: str) -> str:
+    return pwd_context.hash(password)
+
+def hash_passwords(passwords: list) -> list:
+    return [pwd_context.hash(password) for password in passwords]
+
+def verify_password(plain_password: str, hashed_password: str) -> bool:
+    return pwd_context.verify(plain_password[:72], hashed_password)
+
+def verify_and_update(plain_password: str, hashed_password: str) -> tuple[bool, Optional[str]]:
+    """Verify a password, returning a new hash when the stored one uses outdated settings."""
+    return pwd_context.verify_and_update(plain_password[:72], hashed_password)
+
+
+_executor: Optional[Executor] = None
+_pending = 0
+
+def get_executor() -> Executor:
+    global _executor
+    if _executor is None:
+        if settings.password_hash_use_processes:
+            _executor = ProcessPoolExecutor(max_workers=settings.password_hash_workers)
+        else:
+            _executor = ThreadPoolExecutor(max_workers=settings.password_hash_workers, thread_name_prefix="pwhash")
+    return _executor
+
+def shutdown_executor():
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+async def run_hashing(func, *args):
+    """Run a hashing function on the dedicated executor, refusing work past the queue limit."""
+    global _pending
+    if _pending >= settings.password_hash_max_pending:
+        raise HashingOverloaded()
+    _pending += 1
+    try:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(get_executor(), func, *args)
+    finally:
+        _pending -= 1
+
+
+# One bulk import hashes at a time; a second waits rather than doubling the queue
+_bulk_lock = asyncio.Lock()
+
+async def run_hashing_bulk(passwords: list, chunk_size: int = 16) -> list:
+    """Hash many passwords on the shared executor, in input order.
+
+    Only password_hash_workers small chunks are queued at once, so login and
+    signup jobs wait behind a few chunks rather than a whole import, and each
+    chunk counts toward password_hash_max_pending like any other job.
+    """
+    hashed = []
+    window = chunk_size * settings.password_hash_workers
+    async with _bulk_lock:
+        for start in range(0, len(passwords), window):
+            batch = passwords[start:start + window]
+            chunks = [batch[offset:offset + chunk_size] for offset in range(0, len(batch), chunk_size)]
+            for chunk in await asyncio.gather(*(run_hashing(hash_passwords, chunk) for chunk in chunks)):
+                hashed.extend(chunk)
+    return hashed
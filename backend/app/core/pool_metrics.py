@@ -0,0 +1,93 @@
+import threading
+import time
+from collections import deque
+from sqlalchemy import event, exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, Pool
+
+
+class PoolMetrics:
+    """Connection pool counters fed by SQLAlchemy pool events."""
+
+    def __init__(self, window: int = 1000):
+        self.connects = 0
+        self.checkouts = 0
+        self.checkins = 0
+        self.invalidations = 0
+        self.timeouts = 0
+        self.wait_count = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self._recent_waits = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record_wait(self, seconds: float, timed_out: bool = False):
+        with self._lock:
+            self.wait_count += 1
+            self.wait_total += seconds
+            self.wait_max = max(self.wait_max, seconds)
+            self._recent_waits.append(seconds)
+            if timed_out:
+                self.timeouts += 1
+
+    def attach(self, pool: Pool):
+        pool.metrics = self
+
+        def on_connect(dbapi_connection, connection_record):
+            self.connects += 1
+
+        def on_checkout(dbapi_connection, connection_record, connection_proxy):
+            self.checkouts += 1
+
+        def on_checkin(dbapi_connection, connection_record):
+            self.checkins += 1
+
+        def on_invalidate(dbapi_connection, connection_record, exception):
+            self.invalidations += 1
+
+        event.listen(pool, "connect", on_connect)
+        event.listen(pool, "checkout", on_checkout)
+        event.listen(pool, "checkin", on_checkin)
+        event.listen(pool, "invalidate", on_invalidate)
+
+    def snapshot(self, pool: Pool) -> dict:
+        with self._lock:
+            recent = sorted(self._recent_waits)
+            wait = {
+                "count": self.wait_count,
+                "timeouts": self.timeouts,
+                "avg_ms": round(self.wait_total / self.wait_count * 1000, 3) if self.wait_count else 0.0,
+                "max_ms": round(self.wait_max * 1000, 3),
+                "p95_recent_ms": round(recent[int(len(recent) * 0.95) - 1] * 1000, 3) if recent else 0.0,
+            }
+        stats = {
+            "pool_class": type(pool).__name__,
+            "connects": self.connects,
+            "checkouts": self.checkouts,
+            "checkins": self.checkins,
+            "invalidations": self.invalidations,
+            "wait": wait,
+        }
+        # Queue pools expose live occupancy; NullPool/StaticPool do not
+        for name in ("size", "checkedout", "checkedin", "overflow"):
+            func = getattr(pool, name, None)
+            if callable(func):
+                stats[name] = func()
+        return stats
+
+
+class TimedAsyncQueuePool(AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool that records how long each checkout waited for a connection."""
+
+    metrics = None
+
+    def _do_get(self):
+        if self.metrics is None:
+            return super()._do_get()
+        started = time.perf_counter()
+        try:
+            record = super()._do_get()
+        except exc.TimeoutError:
+            self.metrics.record_wait(time.perf_counter() - started, timed_out=True)
+            raise
+        self.metrics.record_wait(time.perf_counter() - started)
+        return record
@@ -0,0 +1,174 @@
+import asyncio
+import json
+import logging
+import time
+import uuid
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Callable, Optional
+from .broker import Broker, broker
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+INVALIDATION_CHANNEL = "invalidate"
+
+
+class SharedStore(ABC):
+    """Cache entries and counters seen by every worker, plus invalidation broadcast.
+
+    get/set/delete/incr hold JSON-serializable values with an optional TTL in
+    seconds. Per-process caches stay where they are for speed; invalidate()
+    runs the handlers registered with on_invalidate() for a namespace in this
+    worker straight away and in every other worker once the broker delivers
+    the event. Broadcasts are best effort (a slow worker may drop some), so
+    local caches must still expire on their own.
+    """
+
+    def __init__(self, broker: Broker):
+        self.broker = broker
+        self.origin = uuid.uuid4().hex
+        self._handlers: "dict[str, list[Callable[[list], None]]]" = {}
+        self._listener: Optional[asyncio.Task] = None
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[Any]:
+        ...
+
+    @abstractmethod
+    async def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        ...
+
+    @abstractmethod
+    async def delete(self, key: str):
+        ...
+
+    @abstractmethod
+    async def incr(self, key: str, amount: int = 1, ttl: Optional[float] = None) -> int:
+        """Add amount and return the new value; ttl starts when the counter is created (fixed windows)."""
+
+    def on_invalidate(self, namespace: str, handler: Callable[[list], None]):
+        self._handlers.setdefault(namespace, []).append(handler)
+
+    def _apply(self, namespace: str, keys: list):
+        for handler in self._handlers.get(namespace, ()):
+            try:
+                handler(keys)
+            except Exception:
+                logger.exception("Invalidation handler for %s failed", namespace)
+
+    async def invalidate(self, namespace: str, *keys):
+        self._apply(namespace, list(keys))
+        try:
+            await self.broker.publish(INVALIDATION_CHANNEL, {"origin": self.origin, "namespace": namespace, "keys": list(keys)})
+        except Exception:
+            # Other workers catch up when their entries expire
+            logger.exception("Could not broadcast %s invalidation", namespace)
+
+    async def start(self):
+        self._listener = asyncio.create_task(self._listen())
+
+    async def _listen(self):
+        async with self.broker.subscribe(INVALIDATION_CHANNEL) as subscription:
+            while True:
+                event = await subscription.get()
+                # This worker already applied its own invalidations
+                if event.get("origin") != self.origin:
+                    self._apply(event.get("namespace"), event.get("keys") or [])
+
+    async def close(self):
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+
+
+class InMemoryStore(SharedStore):
+    """Single-process store: entries and counters are only shared between requests on this worker."""
+
+    def __init__(self, broker: Broker, maxsize: int = 100000):
+        super().__init__(broker)
+        self.maxsize = maxsize
+        self._data: "OrderedDict[str, tuple[float, Any]]" = OrderedDict()
+
+    def _entry(self, key: str) -> Optional[tuple]:
+        entry = self._data.get(key)
+        if entry is not None and entry[0] <= time.monotonic():
+            del self._data[key]
+            return None
+        return entry
+
+    def _put(self, key: str, expires_at: float, value: Any):
+        self._data[key] = (expires_at, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    async def get(self, key: str) -> Optional[Any]:
+        entry = self._entry(key)
+        return None if entry is None else entry[1]
+
+    async def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        self._put(key, time.monotonic() + ttl if ttl else float("inf"), value)
+
+    async def delete(self, key: str):
+        self._data.pop(key, None)
+
+    async def incr(self, key: str, amount: int = 1, ttl: Optional[float] = None) -> int:
+        entry = self._entry(key)
+        if entry is None:
+            entry = (time.monotonic() + ttl if ttl else float("inf"), 0)
+        value = entry[1] + amount
+        self._put(key, entry[0], value)
+        return value
+
+
+class RedisStore(SharedStore):
+    """Keeps entries and counters on a server speaking the Redis protocol (Redis, Valkey, KeyDB).
+
+    Invalidations still travel over the broker, so set BROKER_URL as well.
+    Requires the redis package.
+    """
+
+    def __init__(self, url: str, broker: Broker, prefix: str = "ahh:store:", client=None):
+        super().__init__(broker)
+        if client is None:
+            try:
+                from redis import asyncio as redis_asyncio
+            except ImportError as error:
+                raise RuntimeError("SHARED_STORE_URL is set but the redis package is not installed") from error
+            client = redis_asyncio.from_url(url)
+        self.prefix = prefix
+        self.client = client
+
+    async def get(self, key: str) -> Optional[Any]:
+        raw = await self.client.get(self.prefix + key)
+        return None if raw is None else json.loads(raw)
+
+    async def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        await self.client.set(self.prefix + key, json.dumps(value, default=str), px=int(ttl * 1000) if ttl else None)
+
+    async def delete(self, key: str):
+        await self.client.delete(self.prefix + key)
+
+    async def incr(self, key: str, amount: int = 1, ttl: Optional[float] = None) -> int:
+        value = await self.client.incrby(self.prefix + key, amount)
+        if ttl and value == amount:
+            # This call created the counter, so it starts the window
+            await self.client.pexpire(self.prefix + key, int(ttl * 1000))
+        return value
+
+    async def close(self):
+        await super().close()
+        await self.client.aclose()
+
+
+def make_store(url: Optional[str], broker: Broker) -> SharedStore:
+    if url:
+        return RedisStore(url, broker)
+    return InMemoryStore(broker)
+
+
+shared_store = make_store(settings.shared_store_url or settings.broker_url, broker)
@@ -1,15 +1,135 @@
-from sqlalchemy import create_engine
+from uuid import uuid4
+from fastapi import Request
+from jose import JWTError, jwt
+from sqlalchemy import event
+from sqlalchemy.engine import make_url, URL
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import NullPool
+from .core.cache import TTLCache
 from .core.config import settings
+from .core.shared import shared_store
+from .core.pool_metrics import PoolMetrics, TimedAsyncQueuePool
+
+# Async drivers used for each backend named in DATABASE_URL
+ASYNC_DRIVERS = {
+    "postgres": "postgresql+asyncpg",
+    "postgresql": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+def async_database_url(database_url: str) -> URL:
+    """Translate a plain/sync DATABASE_URL into its asyncio driver equivalent."""
+    url = make_url(database_url)
+    backend = url.get_backend_name()
+    if url.drivername in ("postgresql+asyncpg", "sqlite+aiosqlite") or backend not in ASYNC_DRIVERS:
+        return url
+    url = url.set(drivername=ASYNC_DRIVERS[backend])
+    if url.get_backend_name() == "postgresql":
+        # asyncpg spells libpq's sslmode as ssl and rejects other libpq-only options
+        query = dict(url.query)
+        if "sslmode" in query:
+            query["ssl"] = query.pop("sslmode")
+        query.pop("channel_binding", None)
+        url = url.set(query=query)
+    return url
+
+def engine_options(url: URL) -> dict:
+    """Pool configuration for the given URL, driven by Settings."""
+    if url.get_backend_name() == "sqlite":
+        # SQLite picks its own pool class and does not accept sizing arguments
+        return {}
+    if settings.db_pgbouncer:
+        # PgBouncer owns pooling; asyncpg must not reuse named prepared statements across backends
+        return {
+            "poolclass": NullPool,
+            "connect_args": {
+                "statement_cache_size": 0,
+                "prepared_statement_cache_size": 0,
+                "prepared_statement_name_func": lambda: f"__asyncpg_{uuid4()}__",
+            },
+        }
+    return {
+        "poolclass": TimedAsyncQueuePool,
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout,
+        "pool_recycle": settings.db_pool_recycle,
+        "pool_pre_ping": settings.db_pool_pre_ping,
+    }
+
+def make_engine(database_url: str):
+    url = async_database_url(database_url)
+    new_engine = create_async_engine(url, **engine_options(url))
+    PoolMetrics().attach(new_engine.sync_engine.pool)
+    return new_engine
+
+class PrimarySession(Session):
+    """Session bound to the primary; records which users just wrote through it."""
+
+class PrimaryAsyncSession(AsyncSession):
+    """AsyncSession over PrimarySession that reports a recent writer to every worker on commit."""
+
+    async def commit(self):
+        await super().commit()
+        # Published before the handler returns, so whichever worker serves the client's next read skips the replica
+        writer = self.info.pop("recent_writer", None)
+        if writer is not None and ReplicaSessionLocal is not None:
+            await shared_store.set(_writer_key(writer), True, ttl=settings.read_your_writes_window)
+
+engine = make_engine(settings.database_url)
+SessionLocal = async_sessionmaker(engine, class_=PrimaryAsyncSession, sync_session_class=PrimarySession, autoflush=False, expire_on_commit=False)
+
+replica_engine = make_engine(settings.database_replica_url) if settings.database_replica_url else None
+ReplicaSessionLocal = async_sessionmaker(replica_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False) if replica_engine else None
 
-engine = create_engine(settings.database_url)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
-def get_db():
-    db = SessionLocal()
+# Users who committed a write recently keep reading from the primary until the replica has caught up
+recent_writers = TTLCache(maxsize=100000, ttl=settings.read_your_writes_window)
+
+@event.listens_for(PrimarySession, "after_flush")
+def _flag_orm_write(session, flush_context):
+    session.info["wrote"] = True
+
+@event.listens_for(PrimarySession, "do_orm_execute")
+def _flag_statement_write(orm_execute_state):
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        orm_execute_state.session.info["wrote"] = True
+
+@event.listens_for(PrimarySession, "after_commit")
+def _remember_writer(session):
+    if session.info.pop("wrote", False) and session.info.get("user_id") is not None:
+        recent_writers.set(session.info["user_id"], True)
+        session.info["recent_writer"] = session.info["user_id"]
+
+def _writer_key(user_id: int) -> str:
+    return f"recent_writer:{user_id}"
+
+async def _wrote_recently(user_id: int) -> bool:
+    return bool(recent_writers.get(user_id) or await shared_store.get(_writer_key(user_id)))
+
+def _token_subject(request: Request):
+    # Only used to pick a database, never to authorize, so the signature is not verified here
+    scheme, _, token = request.headers.get("authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
     try:
+        return int(jwt.get_unverified_claims(token).get("sub"))
+    except (JWTError, TypeError, ValueError):
+        return None
+
+async def get_db():
+    async with SessionLocal() as db:
+        yield db
+
+async def get_read_db(request: Request):
+    """Session for read-only handlers: the replica when configured, unless the caller just wrote."""
+    user_id = _token_subject(request)
+    if ReplicaSessionLocal is None or (user_id is not None and await _wrote_recently(user_id)):
+        session_factory = SessionLocal
+    else:
+        session_factory = ReplicaSessionLocal
+    async with session_factory() as db:
         yield db
-    finally:
-        db.close()
\ No newline at end of file
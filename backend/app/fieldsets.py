@@ -0,0 +1,61 @@
+"""Sparse fieldsets: ?fields=user_id,first_name on list endpoints.
+
+The requested names are checked against the response schema, only those
+columns (plus the primary key and whatever the page is ordered by) are
+selected with load_only, and the rows are serialized through a copy of the
+schema that has just those fields. Without ?fields the full schema is used.
+"""
+from typing import Optional
+from fastapi import HTTPException, Query
+from pydantic import TypeAdapter
+from sqlalchemy import inspect
+from sqlalchemy.orm import load_only
+from .serialization import list_adapter
+
+class FieldSet:
+    def __init__(self, schema, model, names: Optional[tuple] = None):
+        self.schema = schema
+        self.model = model
+        self.names = names
+
+    @property
+    def selected(self) -> tuple:
+        """Requested field names, or every projectable field of the schema."""
+        return self.names or tuple(projectable(self.schema, self.model))
+
+    @property
+    def adapter(self) -> TypeAdapter:
+        return list_adapter(self.schema, self.names)
+
+    def apply(self, query, *required):
+        """Restrict query to the requested columns; required are loaded regardless (e.g. the cursor columns)."""
+        if self.names is None:
+            return query
+        columns = [getattr(self.model, name) for name in self.names]
+        return query.options(load_only(*columns, *required))
+
+def projectable(schema, model) -> list:
+    """Fields of schema that are plain columns of model, in schema order."""
+    columns = inspect(model).column_attrs.keys()
+    return [name for name in schema.model_fields if name in columns]
+
+def parse_fields(schema, model, fields: Optional[str]) -> FieldSet:
+    if fields is None:
+        return FieldSet(schema, model)
+    allowed = projectable(schema, model)
+    requested = {name.strip() for name in fields.split(",") if name.strip()}
+    unknown = requested.difference(allowed)
+    if unknown or not requested:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(sorted(unknown)) or fields!r}; allowed: {', '.join(allowed)}")
+    return FieldSet(schema, model, tuple(name for name in allowed if name in requested))
+
+def sparse_fields(schema, model):
+    """Dependency parsing ?fields= for a list of schema built from model rows."""
+    allowed = projectable(schema, model)
+
+    def parse(
+        fields: Optional[str] = Query(None, description=f"Comma-separated fields to return, any of: {', '.join(allowed)}")
+    ) -> FieldSet:
+        return parse_fields(schema, model, fields)
+
+    return parse
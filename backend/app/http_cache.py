@@ -0,0 +1,84 @@
+"""HTTP validators for public catalog endpoints.
+
+A handler works out a strong ETag (and, where the rows carry one, a
+Last-Modified time) from something cheaper than the response body: the row
+itself for single items, or an aggregate "collection version" such as
+count/max(id)/max(updated_at) for lists. When the client's If-None-Match or
+If-Modified-Since shows its copy is current, the handler returns a bare 304
+before fetching the page or serializing anything. Cache-Control lets
+browsers and the Vercel edge reuse a response for catalog_cache_max_age
+seconds and serve it stale while they revalidate in the background.
+
+Timestamps are second-granular on SQLite, so there two edits to the
+programs list within one second can share a collection version.
+"""
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Optional
+from fastapi import Request, Response
+from .core.config import settings
+
+def make_etag(*parts) -> str:
+    """Strong ETag for whatever uniquely identifies a representation."""
+    return '"' + hashlib.blake2b(repr(parts).encode(), digest_size=16).hexdigest() + '"'
+
+def row_etag(row) -> str:
+    """ETag covering every column of an ORM object, so any change to the row changes it."""
+    table = row.__table__
+    return make_etag(table.name, *(getattr(row, column.key) for column in table.columns))
+
+def _http_date(value: datetime) -> str:
+    # Timestamp columns are stored without a zone, in UTC
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return format_datetime(value.astimezone(timezone.utc), usegmt=True)
+
+def _cache_control() -> str:
+    if settings.catalog_cache_max_age <= 0:
+        return "public, no-cache"
+    return (
+        f"public, max-age={settings.catalog_cache_max_age}, "
+        f"stale-while-revalidate={settings.catalog_cache_stale_while_revalidate}"
+    )
+
+def is_fresh(request: Request, etag: str, last_modified: Optional[str] = None) -> bool:
+    """Whether the client's validators show it already holds the representation with these headers."""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        # If-None-Match wins over If-Modified-Since and uses the weak comparison
+        tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return "*" in tags or etag in tags
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since is None or last_modified is None:
+        return False
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    return parsedate_to_datetime(last_modified) <= since
+
+class Conditional:
+    """Conditional GET support for one request.
+
+    fresh() sets ETag, Last-Modified and Cache-Control on the response and
+    says whether the client already holds this representation; if so the
+    handler returns not_modified() instead of the body.
+    """
+
+    def __init__(self, request: Request, response: Response):
+        self.request = request
+        self.response = response
+        self.headers = {}
+
+    def fresh(self, etag: str, last_modified: Optional[datetime] = None) -> bool:
+        self.headers = {"ETag": etag, "Cache-Control": _cache_control()}
+        if last_modified is not None:
+            self.headers["Last-Modified"] = _http_date(last_modified)
+        self.response.headers.update(self.headers)
+        return is_fresh(self.request, etag, self.headers.get("Last-Modified"))
+
+    def not_modified(self) -> Response:
+        return Response(status_code=304, headers=self.headers)
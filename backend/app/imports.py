@@ -0,0 +1,126 @@
+"""Bulk CSV/NDJSON imports of users, resources and programs.
+
+An upload is parsed and every record validated with the schema its single
+create endpoint uses, so a bad record is reported by number instead of
+failing the whole file. The records that pass are written with one
+multi-row INSERT ... RETURNING per batch (app.writes.insert_many_returning)
+in a single transaction; going through the ORM rather than COPY keeps the
+dashboard counters and search hooks that watch inserts up to date.
+
+User passwords are hashed in chunks on the login/signup hashing executor
+before anything is written, which is where nearly all of an import's time
+goes. Emails that are repeated within the upload or already registered
+are reported rather than inserted, the same rule signup applies.
+"""
+import csv
+import io
+from typing import Iterator, Union
+import orjson
+from pydantic import ValidationError
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from .exports import DataFormat
+from .models.user import User
+from .models.programs import Program
+from .models.resources import Resource, ResourceCategory
+from .models.enums import UserRole
+from .schemas.imports import ImportRowError
+from .security import hash_passwords_async
+from .writes import insert_many_returning
+
+def read_records(body: bytes, data_format: DataFormat) -> Iterator[tuple[int, Union[dict, str]]]:
+    """Yield (record number, fields) per record, or (record number, error) when it cannot be parsed.
+
+    Empty CSV cells count as missing, so optional columns take their defaults.
+    """
+    text = body.decode("utf-8-sig")
+    if data_format is DataFormat.CSV:
+        reader = csv.DictReader(io.StringIO(text))
+        for number, row in enumerate(reader, 1):
+            if None in row:
+                yield number, "More cells than header columns"
+                continue
+            yield number, {name: value for name, value in row.items() if value not in (None, "")}
+        return
+    lines = (line for line in text.splitlines() if line.strip())
+    for number, line in enumerate(lines, 1):
+        try:
+            fields = orjson.loads(line)
+        except orjson.JSONDecodeError:
+            yield number, "Invalid JSON"
+            continue
+        yield number, fields if isinstance(fields, dict) else "Expected a JSON object"
+
+def _messages(error: ValidationError) -> list:
+    return [
+        f"{'.'.join(str(part) for part in detail['loc'])}: {detail['msg']}" if detail["loc"] else detail["msg"]
+        for detail in error.errors()
+    ]
+
+def validate_records(schema, records) -> tuple[list, list]:
+    """Split records into (number, schema instance) pairs and the errors of those that failed."""
+    valid, errors = [], []
+    for number, fields in records:
+        if isinstance(fields, str):
+            errors.append(ImportRowError(row=number, errors=[fields]))
+            continue
+        try:
+            valid.append((number, schema.model_validate(fields)))
+        except ValidationError as exc:
+            errors.append(ImportRowError(row=number, errors=_messages(exc)))
+    return valid, errors
+
+async def import_users(db: AsyncSession, valid: list, admin: User, approve: bool = False) -> tuple[int, list]:
+    errors, pending, seen = [], [], set()
+    for number, user in valid:
+        if user.email in seen:
+            errors.append(ImportRowError(row=number, errors=["Email repeated in upload"]))
+            continue
+        seen.add(user.email)
+        pending.append((number, user))
+
+    hashes = await hash_passwords_async([user.password for _, user in pending])
+    created = await insert_many_returning(db, User, [
+        {
+            "first_name": user.first_name,
+            "last_name": user.last_name,
+            "email": user.email,
+            "password_hash": hashed,
+            "role": user.role,
+            # Like signup, only admins start approved unless the import approves everyone
+            "is_approved": approve or user.role == UserRole.ADMIN,
+            "profile_details": user.profile_details
+        }
+        for (_, user), hashed in zip(pending, hashes)
+    ], conflict=(User.email,))
+    inserted = {user.email for user in created}
+    errors += [
+        ImportRowError(row=number, errors=["Email already registered"])
+        for number, user in pending if user.email not in inserted
+    ]
+    return len(created), errors
+
+async def import_resources(db: AsyncSession, valid: list, admin: User, approve: bool = False) -> tuple[int, list]:
+    # The category table is small, so one read answers the check for every record
+    categories = set(await db.scalars(select(ResourceCategory.category_id)))
+    errors = [
+        ImportRowError(row=number, errors=["Resource category not found"])
+        for number, resource in valid if resource.category_id not in categories
+    ]
+    created = await insert_many_returning(db, Resource, [
+        {
+            "category_id": resource.category_id,
+            "uploaded_by_id": admin.user_id,
+            "title": resource.title,
+            "description": resource.description,
+            "url": resource.url
+        }
+        for _, resource in valid if resource.category_id in categories
+    ])
+    return len(created), errors
+
+async def import_programs(db: AsyncSession, valid: list, admin: User, approve: bool = False) -> tuple[int, list]:
+    created = await insert_many_returning(db, Program, [
+        {**program.model_dump(), "created_by": admin.user_id} for _, program in valid
+    ])
+    return len(created), []
@@ -1,6 +1,15 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from app.database import engine, Base
+from fastapi.responses import ORJSONResponse
+from app.database import engine, Base, SessionLocal
+from .core.config import settings
+from .core.broker import broker
+from .core.shared import shared_store
+from .core.hashing import shutdown_executor
+from .metrics import rebuild_counters
+from .pagination import NEXT_CURSOR_HEADER
+from .retention import ensure_message_partitions
 from .routes.auth import router as auth_router
 from .routes.users import router as users_router
 from .routes.ventures import router as ventures_router
@@ -12,10 +21,27 @@ from .routes.messages import router as messages_router
 from .routes.programs import router as programs_router
 from .routes.admin import router as admin_router
 from .routes.dashboard import router as dashboard_router
+from .routes.ws import router as ws_router
 
-Base.metadata.create_all(bind=engine)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    if settings.metrics_counters:
+        # Start from exact counts; flushes keep them current from here on
+        async with SessionLocal() as db:
+            await rebuild_counters(db)
+    async with SessionLocal() as db:
+        await ensure_message_partitions(db)
+    await broker.start()
+    await shared_store.start()
+    yield
+    await shared_store.close()
+    await broker.close()
+    shutdown_executor()
+    await engine.dispose()
 
-app = FastAPI(title="African Healthpreneurship Hub API")
+app = FastAPI(title="African Healthpreneurship Hub API", lifespan=lifespan, default_response_class=ORJSONResponse)
 
 # CORS setup
 app.add_middleware(
@@ -23,7 +49,8 @@ app.add_middleware(
     allow_origins=["http://localhost:5173", "http://localhost:5174","https://ahh-web-beryl.vercel.app"],  # Frontend origins
     allow_credentials=True,
     allow_methods=["*"],
-    allow_headers=["*"]
+    allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER]
 )
 
 @app.get("/", summary="Welcome message", description="Returns a welcome message for the African Healthpreneurship Hub API")
@@ -40,4 +67,5 @@ app.include_router(mentor_matches_router)
 app.include_router(messages_router)
 app.include_router(programs_router)
 app.include_router(admin_router)
-app.include_router(dashboard_router)
\ No newline at end of file
+app.include_router(dashboard_router)
+app.include_router(ws_router)
\ No newline at end of file
@@ -0,0 +1,184 @@
+"""Platform-wide counts shown on the admin dashboard.
+
+Every count comes from one statement: each table is aggregated once with
+COUNT(*) FILTER (WHERE ...) and the one-row results are joined together.
+The result is kept in a short-lived snapshot cache. With METRICS_COUNTERS
+enabled the counts are instead maintained incrementally in the
+platform_counters table, so a refresh reads a few rows however large the
+tables grow.
+"""
+from collections import defaultdict
+
+from sqlalchemy import delete, event, func, insert, inspect, select, true, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .core.cache import TTLCache
+from .core.config import settings
+from .database import PrimarySession
+from .models.user import User
+from .models.ventures import Venture
+from .models.programs import Program
+from .models.applications import Application
+from .models.mentor_matches import MentorMatch
+from .models.resources import Resource
+from .models.platform_counters import PlatformCounter
+from .models.enums import UserRole, ApplicationStatus, MatchStatus
+
+# (group, metric, model, (attribute, value) the row must match or None to count every row)
+METRICS = (
+    ("users", "total", User, None),
+    ("users", "approved", User, ("is_approved", True)),
+    ("users", "pending_approval", User, ("is_approved", False)),
+    ("users", "admins", User, ("role", UserRole.ADMIN)),
+    ("users", "mentors", User, ("role", UserRole.MENTOR)),
+    ("users", "members", User, ("role", UserRole.MEMBER)),
+    ("ventures", "total", Venture, None),
+    ("applications", "total", Application, None),
+    ("applications", "pending", Application, ("status", ApplicationStatus.SUBMITTED)),
+    ("applications", "approved", Application, ("status", ApplicationStatus.APPROVED)),
+    ("mentor_matches", "total", MentorMatch, None),
+    ("mentor_matches", "active", MentorMatch, ("status", MatchStatus.ACCEPTED)),
+    ("programs", "total", Program, None),
+    ("programs", "active", Program, ("is_active", 1)),
+    ("resources", "total", Resource, None),
+)
+
+metrics_cache = TTLCache(maxsize=1, ttl=settings.metrics_cache_ttl)
+
+def _counter_name(group: str, metric: str) -> str:
+    return f"{group}.{metric}"
+
+def aggregate_query():
+    """One SELECT returning every metric as a column named "<group>.<metric>"."""
+    by_model = defaultdict(list)
+    for group, metric, model, criterion in METRICS:
+        count = func.count()
+        if criterion is not None:
+            attribute, value = criterion
+            count = count.filter(getattr(model, attribute) == value)
+        by_model[model].append(count.label(_counter_name(group, metric)))
+
+    subqueries = [select(*counts).select_from(model).subquery() for model, counts in by_model.items()]
+    query = select(*[column for subquery in subqueries for column in subquery.c]).select_from(subqueries[0])
+    # Each side is a single aggregate row, so joining on TRUE keeps it one row
+    for subquery in subqueries[1:]:
+        query = query.join(subquery, true())
+    return query
+
+async def _aggregate_counts(db: AsyncSession) -> dict:
+    return dict((await db.execute(aggregate_query())).one()._mapping)
+
+async def _stored_counts(db: AsyncSession) -> dict:
+    return dict((await db.execute(select(PlatformCounter.name, PlatformCounter.value))).all())
+
+async def platform_metrics(db: AsyncSession) -> dict:
+    snapshot = metrics_cache.get("platform")
+    if snapshot is not None:
+        return snapshot
+
+    counts = await (_stored_counts(db) if settings.metrics_counters else _aggregate_counts(db))
+    snapshot = defaultdict(dict)
+    for group, metric, _, _ in METRICS:
+        snapshot[group][metric] = counts.get(_counter_name(group, metric), 0)
+    snapshot = dict(snapshot)
+    metrics_cache.set("platform", snapshot)
+    return snapshot
+
+async def rebuild_counters(db: AsyncSession):
+    """Recompute platform_counters from the tables, e.g. on startup or after bulk SQL."""
+    counts = await _aggregate_counts(db)
+    await db.execute(delete(PlatformCounter))
+    await db.execute(insert(PlatformCounter), [{"name": name, "value": value} for name, value in counts.items()])
+    await db.commit()
+    metrics_cache.clear()
+
+def _matches(obj, criterion, committed: bool) -> bool:
+    if criterion is None:
+        return True
+    attribute, expected = criterion
+    history = inspect(obj).attrs[attribute].history
+    values = (history.deleted or history.unchanged) if committed else (history.added or history.unchanged)
+    return bool(values) and values[0] == expected
+
+def _row_matches(row, criterion) -> bool:
+    return criterion is None or getattr(row, criterion[0]) == criterion[1]
+
+def _counter_deltas(session) -> dict:
+    deltas = defaultdict(int)
+    for group, metric, model, criterion in METRICS:
+        name = _counter_name(group, metric)
+        for obj in session.new:
+            if isinstance(obj, model) and _matches(obj, criterion, committed=False):
+                deltas[name] += 1
+        for obj in session.deleted:
+            if isinstance(obj, model) and _matches(obj, criterion, committed=True):
+                deltas[name] -= 1
+        if criterion is None:
+            continue
+        for obj in session.dirty:
+            if isinstance(obj, model):
+                deltas[name] += _matches(obj, criterion, committed=False) - _matches(obj, criterion, committed=True)
+    return deltas
+
+def _apply_deltas(connection, deltas: dict):
+    for name, delta in deltas.items():
+        if delta:
+            connection.execute(
+                update(PlatformCounter).where(PlatformCounter.name == name).values(value=PlatformCounter.value + delta)
+            )
+
+def _track_counters(session, flush_context):
+    # Attribute history is still intact in after_flush, and the updates join
+    # the flush's transaction so they commit or roll back with the rows
+    _apply_deltas(session.connection(), _counter_deltas(session))
+
+def _track_statement(orm_execute_state):
+    """Counter upkeep for INSERT/UPDATE/DELETE statements, which bypass the flush.
+
+    Inserts are counted from the rows they return (app.writes always asks for
+    RETURNING). Updates and deletes read the affected rows' counted columns
+    first, so enabling counters costs these statements an extra SELECT.
+    """
+    if not (orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete):
+        return None
+    mapper = orm_execute_state.bind_mapper
+    tracked = [metric for metric in METRICS if mapper is not None and metric[2] is mapper.class_]
+    if not tracked:
+        return None
+
+    model = mapper.class_
+    connection = orm_execute_state.session.connection()
+    statement = orm_execute_state.statement
+    primary_key = inspect(model).primary_key[0]
+    columns = [primary_key] + sorted({getattr(model, c[0]) for *_, c in tracked if c}, key=lambda col: col.key)
+    deltas = defaultdict(int)
+
+    if orm_execute_state.is_insert:
+        result = orm_execute_state.invoke_statement().freeze()
+        for row in result().all():
+            if isinstance(row[0], model):
+                for group, metric, _, criterion in tracked:
+                    deltas[_counter_name(group, metric)] += _row_matches(row[0], criterion)
+        _apply_deltas(connection, deltas)
+        return result()
+
+    before = connection.execute(select(*columns).where(statement.whereclause).with_for_update()).all()
+    result = orm_execute_state.invoke_statement().freeze()
+    after = {}
+    if orm_execute_state.is_update and before:
+        after = {row[0]: row for row in connection.execute(
+            select(*columns).where(primary_key.in_([row[0] for row in before]))
+        ).all()}
+    for row in before:
+        new = after.get(row[0])
+        for group, metric, _, criterion in tracked:
+            name = _counter_name(group, metric)
+            deltas[name] -= _row_matches(row, criterion)
+            if new is not None:
+                deltas[name] += _row_matches(new, criterion)
+    _apply_deltas(connection, deltas)
+    return result()
+
+if settings.metrics_counters:
+    event.listen(PrimarySession, "after_flush", _track_counters)
+    event.listen(PrimarySession, "do_orm_execute", _track_statement)
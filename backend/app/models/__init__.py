@@ -5,5 +5,8 @@ from .resources import Resource, ResourceCategory
 from .applications import Application
 from .milestones import Milestone
 from .mentor_matches import MentorMatch
+from .conversations import Conversation
 from .messages import Message
-from .programs import Program
\ No newline at end of file
+from .message_archive import ArchivedMessage
+from .programs import Program
+from .platform_counters import PlatformCounter
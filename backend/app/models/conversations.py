@@ -0,0 +1,27 @@
+from sqlalchemy import Column, Integer, TIMESTAMP, func, ForeignKey, CheckConstraint, UniqueConstraint, Index
+from sqlalchemy.orm import relationship
+from ..database import Base
+
+def participants(user_a: int, user_b: int) -> tuple:
+    """Canonical (low, high) ordering of a conversation's two user IDs."""
+    return (user_a, user_b) if user_a < user_b else (user_b, user_a)
+
+class Conversation(Base):
+    __tablename__ = "conversations"
+
+    conversation_id = Column(Integer, primary_key=True)
+    user_low_id = Column(Integer, ForeignKey("users.user_id", ondelete="CASCADE"), nullable=False)
+    user_high_id = Column(Integer, ForeignKey("users.user_id", ondelete="CASCADE"), nullable=False)
+    created_at = Column(TIMESTAMP, server_default=func.now())
+    last_message_at = Column(TIMESTAMP, server_default=func.now())
+
+    # Constraints
+    __table_args__ = (
+        CheckConstraint('user_low_id < user_high_id', name='check_conversation_participants_ordered'),
+        UniqueConstraint('user_low_id', 'user_high_id', name='uq_conversations_participants'),
+        Index('ix_conversations_low_last_message_at', 'user_low_id', 'last_message_at'),
+        Index('ix_conversations_high_last_message_at', 'user_high_id', 'last_message_at'),
+    )
+
+    # Relationships
+    messages = relationship("Message", back_populates="conversation")
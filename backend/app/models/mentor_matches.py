@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, TIMESTAMP, func, ForeignKey, Enum, CheckConstraint, UniqueConstraint
+from sqlalchemy import Column, Integer, TIMESTAMP, func, ForeignKey, Enum, CheckConstraint, UniqueConstraint, Index, text
 from sqlalchemy.orm import relationship
 from ..database import Base
 from .enums import MatchStatus
@@ -16,6 +16,10 @@ class MentorMatch(Base):
     __table_args__ = (
         CheckConstraint('mentor_id != member_id', name='check_mentor_not_member'),
         UniqueConstraint('mentor_id', 'member_id', name='unique_mentor_member_match'),
+        Index('ix_mentormatches_mentor_status', 'mentor_id', 'status'),
+        Index('ix_mentormatches_member_status', 'member_id', 'status'),
+        Index('ix_mentormatches_pending', 'mentor_id',
+              postgresql_where=text("status = 'pending'"), sqlite_where=text("status = 'pending'")),
     )
 
     # Relationships
@@ -0,0 +1,17 @@
+from sqlalchemy import Column, Integer, LargeBinary, TIMESTAMP, func, ForeignKey, Index
+from ..database import Base
+
+class ArchivedMessage(Base):
+    __tablename__ = "message_archive"
+
+    message_id = Column(Integer, primary_key=True, autoincrement=False)  # keeps the ID it had in messages
+    conversation_id = Column(Integer, ForeignKey("conversations.conversation_id", ondelete="CASCADE"), nullable=False)
+    sender_id = Column(Integer, ForeignKey("users.user_id", ondelete="CASCADE"), nullable=False)
+    receiver_id = Column(Integer, ForeignKey("users.user_id", ondelete="CASCADE"), nullable=False)
+    content = Column(LargeBinary, nullable=False)  # zlib-compressed UTF-8
+    sent_at = Column(TIMESTAMP, nullable=False)
+    archived_at = Column(TIMESTAMP, server_default=func.now())
+
+    __table_args__ = (
+        Index('ix_message_archive_conversation_sent_at', 'conversation_id', 'sent_at'),
+    )
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, Text, TIMESTAMP, func, ForeignKey, Boolean, CheckConstraint
+from sqlalchemy import Column, Integer, Text, TIMESTAMP, func, ForeignKey, Boolean, CheckConstraint, Index, text
 from sqlalchemy.orm import relationship
 from ..database import Base
 
@@ -8,15 +8,22 @@ class Message(Base):
     message_id = Column(Integer, primary_key=True)
     sender_id = Column(Integer, ForeignKey("users.user_id", ondelete="CASCADE"), nullable=False)
     receiver_id = Column(Integer, ForeignKey("users.user_id", ondelete="CASCADE"), nullable=False)
+    conversation_id = Column(Integer, ForeignKey("conversations.conversation_id", ondelete="CASCADE"), nullable=False)
     content = Column(Text, nullable=False)
-    sent_at = Column(TIMESTAMP, server_default=func.now())
+    sent_at = Column(TIMESTAMP, server_default=func.now(), nullable=False)  # partition key on PostgreSQL
     is_read = Column(Boolean, default=False)
 
     # Constraints
     __table_args__ = (
         CheckConstraint('sender_id != receiver_id', name='check_sender_not_receiver'),
+        Index('ix_messages_sender_receiver_sent_at', 'sender_id', 'receiver_id', 'sent_at'),
+        Index('ix_messages_receiver_sent_at', 'receiver_id', 'sent_at'),
+        Index('ix_messages_conversation_sent_at', 'conversation_id', 'sent_at', 'message_id'),
+        Index('ix_messages_unread', 'receiver_id', 'sender_id',
+              postgresql_where=text('is_read = false'), sqlite_where=text('is_read = 0')),
     )
 
     # Relationships
     sender = relationship("User", foreign_keys=[sender_id], back_populates="sent_messages")
-    receiver = relationship("User", foreign_keys=[receiver_id], back_populates="received_messages")
\ No newline at end of file
+    receiver = relationship("User", foreign_keys=[receiver_id], back_populates="received_messages")
+    conversation = relationship("Conversation", back_populates="messages")
\ No newline at end of file
@@ -7,7 +7,7 @@ class Milestone(Base):
     __tablename__ = "milestones"
 
     milestone_id = Column(Integer, primary_key=True)
-    venture_id = Column(Integer, ForeignKey("ventures.venture_id", ondelete="CASCADE"), nullable=False)
+    venture_id = Column(Integer, ForeignKey("ventures.venture_id", ondelete="CASCADE"), nullable=False, index=True)
     title = Column(String(255), nullable=False)
     description = Column(Text)
     status = Column(Enum(MilestoneStatus, values_callable=lambda x: [e.value for e in x]), default=MilestoneStatus.NOT_STARTED)
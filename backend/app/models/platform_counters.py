@@ -0,0 +1,8 @@
+from sqlalchemy import Column, String, BigInteger
+from ..database import Base
+
+class PlatformCounter(Base):
+    __tablename__ = "platform_counters"
+
+    name = Column(String(64), primary_key=True)  # "<group>.<metric>", e.g. "users.approved"
+    value = Column(BigInteger, nullable=False, default=0)
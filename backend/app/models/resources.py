@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, TIMESTAMP, func, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, TIMESTAMP, func, ForeignKey, Index, DDL, event
 from sqlalchemy.orm import relationship
 from ..database import Base
 
@@ -16,12 +16,48 @@ class Resource(Base):
 
     resource_id = Column(Integer, primary_key=True)
     category_id = Column(Integer, ForeignKey("resourcecategories.category_id", ondelete="CASCADE"), nullable=False)
-    uploaded_by_id = Column(Integer, ForeignKey("users.user_id", ondelete="CASCADE"), nullable=False)
+    uploaded_by_id = Column(Integer, ForeignKey("users.user_id", ondelete="CASCADE"), nullable=False, index=True)
     title = Column(String(255), nullable=False)
     description = Column(Text)
     url = Column(String(2048))
     created_at = Column(TIMESTAMP, server_default=func.now())
 
+    __table_args__ = (
+        Index('ix_resources_category_created_at', 'category_id', 'created_at'),
+        Index('ix_resources_created_at', 'created_at', 'resource_id'),
+    )
+
     # Relationships
     category = relationship("ResourceCategory", back_populates="resources")
-    uploaded_by = relationship("User", back_populates="resources")
\ No newline at end of file
+    uploaded_by = relationship("User", back_populates="resources")
+
+# Full-text search over title and description, maintained by the database on
+# every insert, update and delete (see app/search.py). PostgreSQL keeps a
+# weighted tsvector in a generated column under a GIN index; SQLite keeps an
+# external-content FTS5 table in step through triggers.
+SEARCH_DDL = {
+    "postgresql": [
+        "ALTER TABLE resources ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS ("
+        "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+        "setweight(to_tsvector('english', coalesce(description, '')), 'B')) STORED",
+        "CREATE INDEX IF NOT EXISTS ix_resources_search_vector ON resources USING GIN (search_vector)",
+    ],
+    "sqlite": [
+        "CREATE VIRTUAL TABLE IF NOT EXISTS resources_fts USING fts5("
+        "title, description, content='resources', content_rowid='resource_id', tokenize='porter unicode61')",
+        "CREATE TRIGGER IF NOT EXISTS resources_fts_insert AFTER INSERT ON resources BEGIN "
+        "INSERT INTO resources_fts(rowid, title, description) VALUES (new.resource_id, new.title, new.description); END",
+        "CREATE TRIGGER IF NOT EXISTS resources_fts_delete AFTER DELETE ON resources BEGIN "
+        "INSERT INTO resources_fts(resources_fts, rowid, title, description) "
+        "VALUES ('delete', old.resource_id, old.title, old.description); END",
+        "CREATE TRIGGER IF NOT EXISTS resources_fts_update AFTER UPDATE OF title, description ON resources BEGIN "
+        "INSERT INTO resources_fts(resources_fts, rowid, title, description) "
+        "VALUES ('delete', old.resource_id, old.title, old.description); "
+        "INSERT INTO resources_fts(rowid, title, description) VALUES (new.resource_id, new.title, new.description); END",
+    ],
+}
+
+for dialect, statements in SEARCH_DDL.items():
+    for statement in statements:
+        event.listen(Resource.__table__, "after_create", DDL(statement).execute_if(dialect=dialect))
+
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, TIMESTAMP, func, Enum, Boolean
+from sqlalchemy import Column, Integer, String, Text, TIMESTAMP, func, Enum, Boolean, Index, text, DDL, event
 from sqlalchemy.orm import relationship
 from ..database import Base
 from .enums import UserRole
@@ -16,6 +16,12 @@ class User(Base):
     profile_details = Column(Text)
     created_at = Column(TIMESTAMP, server_default=func.now())
 
+    __table_args__ = (
+        Index('ix_users_role_is_approved', 'role', 'is_approved'),
+        Index('ix_users_pending_approval', 'created_at',
+              postgresql_where=text('is_approved = false'), sqlite_where=text('is_approved = 0')),
+    )
+
     # Relationships
     ventures = relationship("Venture", back_populates="member")
     resources = relationship("Resource", back_populates="uploaded_by")
@@ -23,4 +29,16 @@ class User(Base):
     mentor_matches_as_mentor = relationship("MentorMatch", foreign_keys="MentorMatch.mentor_id", back_populates="mentor")
     mentor_matches_as_member = relationship("MentorMatch", foreign_keys="MentorMatch.member_id", back_populates="member")
     sent_messages = relationship("Message", foreign_keys="Message.sender_id", back_populates="sender")
-    received_messages = relationship("Message", foreign_keys="Message.receiver_id", back_populates="receiver")
\ No newline at end of file
+    received_messages = relationship("Message", foreign_keys="Message.receiver_id", back_populates="receiver")
+
+# People search (see app/user_search.py) matches against this lower-cased
+# " first last email" expression; PostgreSQL indexes its trigrams with
+# pg_trgm. The query must spell the expression exactly like this to use it.
+SEARCH_TEXT_SQL = "lower(' ' || first_name || ' ' || last_name || ' ' || email)"
+SEARCH_DDL = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    f"CREATE INDEX IF NOT EXISTS ix_users_search_trgm ON users USING GIN ({SEARCH_TEXT_SQL} gin_trgm_ops)",
+]
+
+for statement in SEARCH_DDL:
+    event.listen(User.__table__, "after_create", DDL(statement).execute_if(dialect="postgresql"))
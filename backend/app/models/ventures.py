@@ -6,7 +6,7 @@ class Venture(Base):
     __tablename__ = "ventures"
 
     venture_id = Column(Integer, primary_key=True)
-    member_id = Column(Integer, ForeignKey("users.user_id", ondelete="CASCADE"), nullable=False)
+    member_id = Column(Integer, ForeignKey("users.user_id", ondelete="CASCADE"), nullable=False, index=True)
     venture_name = Column(String(255), nullable=False)
     description = Column(Text)
     created_at = Column(TIMESTAMP, server_default=func.now())
@@ -0,0 +1,77 @@
+"""Load a row and check that the caller owns it in a single statement.
+
+Milestones and applications belong to whoever owns their venture, so the
+lookup joins to ventures and selects the ownership test as an extra column.
+A missing row means 404, a row whose ownership column is false means 403,
+and neither needs a second query.
+"""
+
+from fastapi import HTTPException
+from sqlalchemy import inspect, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .models import Application, MentorMatch, Milestone, Resource, Venture
+from .writes import update_returning
+
+def owner_clause(model, user_id: int):
+    """SQL condition that is true when user_id owns a row of model (joined to ventures where needed)."""
+    if model is Venture or model in (Milestone, Application):
+        return Venture.member_id == user_id
+    if model is MentorMatch:
+        return or_(MentorMatch.mentor_id == user_id, MentorMatch.member_id == user_id)
+    if model is Resource:
+        return Resource.uploaded_by_id == user_id
+    raise ValueError(f"No ownership rule for {model.__name__}")
+
+def owner_filter(model, user_id: int):
+    """owner_clause() for statements on model alone, such as UPDATE ... WHERE."""
+    if model in (Milestone, Application):
+        return model.venture_id.in_(select(Venture.venture_id).where(Venture.member_id == user_id))
+    return owner_clause(model, user_id)
+
+def owned_query(model, object_id: int, user_id: int, owned=None):
+    """SELECT model, <owned> for one primary key; pass owned to override the default rule."""
+    primary_key = inspect(model).primary_key[0]
+    if owned is None:
+        owned = owner_clause(model, user_id)
+    query = select(model, owned.label("owned")).where(primary_key == object_id)
+    if model in (Milestone, Application):
+        query = query.join(Venture, model.venture_id == Venture.venture_id)
+    return query
+
+async def get_owned(
+    db: AsyncSession,
+    model,
+    object_id: int,
+    user_id: int,
+    not_found: str,
+    forbidden: str,
+    owned=None,
+    options: tuple = (),
+):
+    row = (await db.execute(owned_query(model, object_id, user_id, owned).options(*options))).first()
+    if row is None:
+        raise HTTPException(status_code=404, detail=not_found)
+    if not row.owned:
+        raise HTTPException(status_code=403, detail=forbidden)
+    return row[0]
+
+async def update_owned(
+    db: AsyncSession,
+    model,
+    object_id: int,
+    user_id: int,
+    values: dict,
+    not_found: str,
+    forbidden: str,
+    owned=None,
+):
+    """UPDATE ... WHERE <owned> RETURNING the row; only a miss costs a lookup to pick 404 or 403."""
+    updated = await update_returning(
+        db, model, object_id, values, owner_filter(model, user_id) if owned is None else owned
+    )
+    if updated is None:
+        await get_owned(db, model, object_id, user_id, not_found, forbidden, owned)
+        # Ownership changed between the two statements
+        raise HTTPException(status_code=404, detail=not_found)
+    return updated
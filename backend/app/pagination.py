@@ -0,0 +1,102 @@
+import base64
+import binascii
+import json
+from datetime import datetime, timezone
+from typing import Optional
+from fastapi import HTTPException, Query, Response
+from sqlalchemy import String, literal, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+def encode_cursor(values: list) -> str:
+    raw = json.dumps([v.isoformat() if isinstance(v, datetime) else v for v in values])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str, columns: tuple) -> list:
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        if not isinstance(values, list) or len(values) != len(columns):
+            raise ValueError(cursor)
+        decoded = []
+        for column, value in zip(columns, values):
+            python_type = column.type.python_type
+            decoded.append(datetime.fromisoformat(value) if python_type is datetime else python_type(value))
+        return decoded
+    except (ValueError, TypeError, binascii.Error, UnicodeDecodeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+def _bound(value, dialect: Optional[str]):
+    # SQLite keeps timestamps as text and CURRENT_TIMESTAMP defaults have no
+    # fractional part, while bound datetimes always carry ".000000"; compare
+    # against the same text form or equal timestamps never sort past the cursor.
+    if dialect == "sqlite" and isinstance(value, datetime):
+        return literal(value.isoformat(sep=" ", timespec="microseconds" if value.microsecond else "seconds"), String)
+    return value
+
+def _naive_utc(value: datetime) -> datetime:
+    # Timestamp columns are stored without a zone, in UTC
+    if value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+def time_window(query, column, since: Optional[datetime], until: Optional[datetime], dialect: Optional[str] = None):
+    """Keep rows with since <= column < until; either end may be open.
+
+    On a table partitioned by column the planner skips every partition
+    outside the window.
+    """
+    if since is not None:
+        query = query.where(column >= _bound(_naive_utc(since), dialect))
+    if until is not None:
+        query = query.where(column < _bound(_naive_utc(until), dialect))
+    return query
+
+class CursorPage:
+    """Keyset pagination parameters for list endpoints.
+
+    Pages are ordered by the given columns (the last one must be unique) and
+    continue strictly after the row encoded in the cursor, so deep pages cost
+    the same as the first. The cursor for the next page is returned in the
+    X-Next-Cursor response header and is absent on the last page.
+    """
+
+    def __init__(
+        self,
+        response: Response,
+        cursor: Optional[str] = Query(None, description="Opaque cursor taken from the X-Next-Cursor header of the previous page"),
+        limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="Maximum number of items to return")
+    ):
+        self.response = response
+        self.cursor = cursor
+        self.limit = limit
+
+    def apply(self, query, *order_by, descending: bool = False, dialect: Optional[str] = None):
+        if self.cursor:
+            values = [_bound(value, dialect) for value in decode_cursor(self.cursor, order_by)]
+            if len(order_by) == 1:
+                key, bound = order_by[0], values[0]
+            else:
+                key, bound = tuple_(*order_by), tuple_(*values)
+                # Implied by the row comparison, but only a plain bound on the leading
+                # column lets the planner prune partitions and start an index range there
+                leading = order_by[0]
+                query = query.where(leading <= values[0] if descending else leading >= values[0])
+            query = query.where(key < bound if descending else key > bound)
+        ordering = [column.desc() if descending else column.asc() for column in order_by]
+        # One extra row tells us whether another page exists
+        return query.order_by(*ordering).limit(self.limit + 1)
+
+    def finish(self, rows: list, *order_by) -> list:
+        if len(rows) <= self.limit:
+            return rows
+        rows = rows[:self.limit]
+        self.response.headers[NEXT_CURSOR_HEADER] = encode_cursor([getattr(rows[-1], column.key) for column in order_by])
+        return rows
+
+    async def fetch(self, db: AsyncSession, query, *order_by, descending: bool = False) -> list:
+        dialect = db.get_bind().dialect.name
+        rows = (await db.scalars(self.apply(query, *order_by, descending=descending, dialect=dialect))).all()
+        return self.finish(list(rows), *order_by)
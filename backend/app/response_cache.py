@@ -0,0 +1,102 @@
+"""Route-level cache of whole responses for hot public reads.
+
+Routers built with route_class=CachedRoute cache the responses of endpoints
+marked with @cached(*tags): status, headers and the serialized body, keyed
+by method, path, sorted query string and the caller's role. A hit replays
+the stored bytes, or a 304 when the client's ETag still matches, without
+touching the database or the endpoint.
+
+Every tag carries a generation number that is part of the key, so
+invalidate(tag), awaited by write routes after they commit, makes all
+entries for that tag unreachable at once in every worker (through the
+shared store's broadcast); they then age out of the LRU. Entries also
+expire after response_cache_ttl seconds, which bounds how long writes made
+outside these routes, or a missed broadcast, stay hidden.
+"""
+from collections import defaultdict
+from typing import Optional
+from fastapi import Request, Response
+from fastapi.routing import APIRoute
+from jose import JWTError
+from .core.cache import TTLCache
+from .core.config import settings
+from .core.shared import shared_store
+from .http_cache import is_fresh
+from .security import decode_access_token
+
+CACHE_HEADERS = ("etag", "last-modified", "cache-control")
+
+response_cache = TTLCache(settings.response_cache_size, settings.response_cache_ttl)
+_generations = defaultdict(int)
+_route_lookups = defaultdict(lambda: {"hits": 0, "misses": 0})
+
+def cached(*tags: str):
+    """Mark an endpoint as cacheable; writes that invalidate any of tags evict it."""
+    def decorate(endpoint):
+        endpoint.cache_tags = tags
+        return endpoint
+    return decorate
+
+def _bump_generations(tags: list):
+    for tag in tags:
+        _generations[tag] += 1
+
+shared_store.on_invalidate("response_tags", _bump_generations)
+
+async def invalidate(*tags: str):
+    await shared_store.invalidate("response_tags", *tags)
+
+def response_cache_stats() -> dict:
+    routes = {}
+    for path, lookups in _route_lookups.items():
+        total = lookups["hits"] + lookups["misses"]
+        routes[path] = {**lookups, "hit_rate": round(lookups["hits"] / total, 4) if total else 0.0}
+    return {**response_cache.stats(), "routes": routes, "generations": dict(_generations)}
+
+def _principal_role(request: Request) -> Optional[str]:
+    # Verified, so a forged token cannot read another role's cached responses
+    scheme, _, token = request.headers.get("authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    try:
+        return decode_access_token(token).get("role")
+    except JWTError:
+        return None
+
+class CachedRoute(APIRoute):
+    """APIRoute that serves @cached endpoints from response_cache."""
+
+    def get_route_handler(self):
+        handler = super().get_route_handler()
+        tags = getattr(self.endpoint, "cache_tags", None)
+        if not tags:
+            return handler
+        lookups = _route_lookups[self.path]
+
+        async def cached_handler(request: Request) -> Response:
+            key = (
+                request.method,
+                request.url.path,
+                tuple(sorted(request.query_params.multi_items())),
+                _principal_role(request),
+                tuple(_generations[tag] for tag in tags),
+            )
+            entry = response_cache.get(key)
+            if entry is None:
+                lookups["misses"] += 1
+                response = await handler(request)
+                # A 304 was answered from the client's own validators and has no body worth keeping
+                if response.status_code == 200:
+                    response_cache.set(key, (response.body, list(response.raw_headers)))
+                return response
+
+            lookups["hits"] += 1
+            body, raw_headers = entry
+            headers = {name.decode(): value.decode() for name, value in raw_headers}
+            if "etag" in headers and is_fresh(request, headers["etag"], headers.get("last-modified")):
+                return Response(status_code=304, headers={name: headers[name] for name in CACHE_HEADERS if name in headers})
+            response = Response(content=body)
+            response.raw_headers = list(raw_headers)
+            return response
+
+        return cached_handler
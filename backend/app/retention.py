@@ -0,0 +1,165 @@
+"""Monthly message partitions, retention and archival.
+
+On PostgreSQL the messages table is range-partitioned by month of sent_at
+(see migration 0005), so time-bounded reads only touch the partitions that
+can hold matching rows. Partitions are created a few months ahead at
+startup and by every retention run; anything outside them lands in the
+default partition. SQLite has no partitioning and keeps messages in one
+table, indexed the same way.
+
+Retention moves read messages older than MESSAGE_RETENTION_DAYS into
+message_archive with their content zlib-compressed. Each batch is copied
+and deleted in one transaction, so a message is always in exactly one of
+the two tables, and locked rows are skipped so concurrent runs split the
+work. Partitions left empty afterwards are detached and dropped.
+"""
+import logging
+import re
+import zlib
+from datetime import date, datetime, timedelta
+from typing import Optional
+
+from sqlalchemy import delete, insert, select, text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .core.config import settings
+from .models import ArchivedMessage, Message
+
+logger = logging.getLogger(__name__)
+
+# pg_advisory_xact_lock key serializing partition DDL across workers
+PARTITION_LOCK = 0x61686801
+PARTITION_NAME = re.compile(r"^messages_p(\d{4})_(\d{2})$")
+
+def compress_content(content: str) -> bytes:
+    return zlib.compress(content.encode())
+
+def decompress_content(content: bytes) -> str:
+    return zlib.decompress(content).decode()
+
+def month_start(day: date) -> date:
+    return date(day.year, day.month, 1)
+
+def add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+def partition_name(month: date) -> str:
+    return f"messages_p{month:%Y_%m}"
+
+async def is_partitioned(db: AsyncSession) -> bool:
+    if db.get_bind().dialect.name != "postgresql":
+        return False
+    return bool(await db.scalar(text(
+        "SELECT EXISTS (SELECT 1 FROM pg_partitioned_table pt "
+        "JOIN pg_class c ON c.oid = pt.partrelid WHERE c.relname = 'messages')"
+    )))
+
+async def message_partitions(db: AsyncSession) -> dict:
+    """Monthly partitions of messages by their first day; the default partition is left out."""
+    names = (await db.scalars(text(
+        "SELECT child.relname FROM pg_inherits i "
+        "JOIN pg_class child ON child.oid = i.inhrelid "
+        "JOIN pg_class parent ON parent.oid = i.inhparent WHERE parent.relname = 'messages'"
+    ))).all()
+    partitions = {}
+    for name in names:
+        match = PARTITION_NAME.match(name)
+        if match:
+            partitions[date(int(match[1]), int(match[2]), 1)] = name
+    return partitions
+
+async def ensure_message_partitions(db: AsyncSession, months_ahead: Optional[int] = None) -> list:
+    """Create the monthly partitions from this month through months_ahead; returns the new ones."""
+    if not await is_partitioned(db):
+        return []
+    if months_ahead is None:
+        months_ahead = settings.message_partition_months_ahead
+    await db.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": PARTITION_LOCK})
+    existing = await message_partitions(db)
+    this_month = month_start(datetime.utcnow().date())
+    created = []
+    for offset in range(months_ahead + 1):
+        month = add_months(this_month, offset)
+        if month in existing:
+            continue
+        try:
+            async with db.begin_nested():
+                await db.execute(text(
+                    f"CREATE TABLE {partition_name(month)} PARTITION OF messages "
+                    f"FOR VALUES FROM ('{month.isoformat()}') TO ('{add_months(month, 1).isoformat()}')"
+                ))
+            created.append(partition_name(month))
+        except DBAPIError:
+            # The default partition already holds rows for this month; they stay there
+            logger.warning("Could not create partition %s", partition_name(month), exc_info=True)
+    await db.commit()
+    return created
+
+async def archive_messages(db: AsyncSession, older_than: datetime, batch_size: Optional[int] = None) -> int:
+    """Move read messages sent before older_than into message_archive; returns how many moved."""
+    if batch_size is None:
+        batch_size = settings.message_archive_batch_size
+    moved, after = 0, 0
+    while True:
+        # Walk the primary key so every batch starts where the last one ended, and keep the
+        # sent_at bound so PostgreSQL only scans partitions that can be past retention
+        rows = (await db.execute(
+            select(
+                Message.message_id, Message.conversation_id, Message.sender_id,
+                Message.receiver_id, Message.content, Message.sent_at
+            ).where(
+                Message.message_id > after, Message.sent_at < older_than, Message.is_read == True
+            ).order_by(Message.message_id).limit(batch_size).with_for_update(skip_locked=True)
+        )).all()
+        if not rows:
+            break
+        await db.execute(insert(ArchivedMessage), [
+            {
+                "message_id": row.message_id, "conversation_id": row.conversation_id,
+                "sender_id": row.sender_id, "receiver_id": row.receiver_id,
+                "content": compress_content(row.content), "sent_at": row.sent_at,
+            }
+            for row in rows
+        ])
+        await db.execute(
+            delete(Message).where(
+                Message.message_id.in_([row.message_id for row in rows]), Message.sent_at < older_than
+            ).execution_options(synchronize_session=False)
+        )
+        await db.commit()
+        moved += len(rows)
+        after = rows[-1].message_id
+        if len(rows) < batch_size:
+            break
+    return moved
+
+async def drop_empty_partitions(db: AsyncSession, before: date) -> list:
+    """Detach and drop monthly partitions that end before `before` and hold no rows."""
+    if not await is_partitioned(db):
+        return []
+    await db.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": PARTITION_LOCK})
+    dropped = []
+    for month, name in sorted((await message_partitions(db)).items()):
+        if add_months(month, 1) > before:
+            break
+        if await db.scalar(text(f"SELECT EXISTS (SELECT 1 FROM {name})")):
+            continue
+        await db.execute(text(f"ALTER TABLE messages DETACH PARTITION {name}"))
+        await db.execute(text(f"DROP TABLE {name}"))
+        dropped.append(name)
+    await db.commit()
+    return dropped
+
+async def run_retention(db: AsyncSession, retention_days: Optional[int] = None, batch_size: Optional[int] = None) -> dict:
+    """One retention pass: make sure upcoming partitions exist, archive, drop emptied partitions."""
+    if retention_days is None:
+        retention_days = settings.message_retention_days
+    created = await ensure_message_partitions(db)
+    archived, dropped = 0, []
+    if retention_days > 0:
+        cutoff = datetime.utcnow() - timedelta(days=retention_days)
+        archived = await archive_messages(db, cutoff, batch_size)
+        dropped = await drop_empty_partitions(db, month_start(cutoff.date()))
+    return {"partitions_created": created, "archived": archived, "partitions_dropped": dropped}
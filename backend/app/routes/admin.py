@@ -1,21 +1,59 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from sqlalchemy import func
-from typing import List
-from ..database import get_db
+import csv
+from enum import Enum
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from pydantic import TypeAdapter
+from sqlalchemy import func, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+from ..database import get_db, get_read_db, engine, replica_engine
+from ..core.config import settings
 from ..models.user import User
-from ..models.ventures import Venture
-from ..models.programs import Program
 from ..models.applications import Application
-from ..models.mentor_matches import MentorMatch
-from ..models.resources import Resource
-from ..models.enums import UserRole, ApplicationStatus, MatchStatus
+from ..models.enums import ApplicationStatus, UserRole
 from ..schemas.user import UserResponse, UserUpdate
-from ..schemas.applications import ApplicationUpdate
-from ..security import get_current_user
+from ..schemas.applications import ApplicationResponse, ApplicationUpdate
+from ..schemas.imports import ImportReport
+from ..schemas.programs import ProgramCreate
+from ..schemas.resources import ResourceCreate
+from ..schemas.user import UserCreate
+from ..metrics import metrics_cache, platform_metrics
+from ..exports import MEDIA_TYPES, DataFormat, stream_export
+from ..imports import import_programs, import_resources, import_users, read_records, validate_records
+from ..fieldsets import FieldSet, parse_fields, sparse_fields
+from ..pagination import CursorPage
+from ..serialization import typed_response
+from ..writes import update_returning
+from ..response_cache import invalidate, response_cache_stats
+from ..security import get_current_user, invalidate_principal, principal_cache_stats
 
 router = APIRouter(prefix="/admin", tags=["admin"])
 
+APPLICATION_LIST = TypeAdapter(List[ApplicationResponse])
+
+class ExportEntity(str, Enum):
+    USERS = "users"
+    APPLICATIONS = "applications"
+
+# entity -> (model, schema whose column fields are exported)
+EXPORTS = {
+    ExportEntity.USERS: (User, UserResponse),
+    ExportEntity.APPLICATIONS: (Application, ApplicationResponse),
+}
+
+class ImportEntity(str, Enum):
+    USERS = "users"
+    RESOURCES = "resources"
+    PROGRAMS = "programs"
+
+# entity -> (schema each record is validated with, importer, response cache tag to invalidate)
+IMPORTS = {
+    ImportEntity.USERS: (UserCreate, import_users, None),
+    ImportEntity.RESOURCES: (ResourceCreate, import_resources, "resources"),
+    ImportEntity.PROGRAMS: (ProgramCreate, import_programs, "programs"),
+}
+
 # Middleware to ensure only admins can access these routes
 def admin_required(current_user: User = Depends(get_current_user)):
     if current_user.role != UserRole.ADMIN:
@@ -23,186 +61,218 @@ def admin_required(current_user: User = Depends(get_current_user)):
     return current_user
 
 @router.get("/dashboard/metrics", summary="Get platform metrics")
-def get_platform_metrics(
-    db: Session = Depends(get_db),
+async def get_platform_metrics(
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(admin_required)
 ):
     """Get comprehensive platform metrics for admin dashboard"""
-    
-    # Count users by role
-    total_users = db.query(User).count()
-    approved_users = db.query(User).filter(User.is_approved == True).count()
-    pending_approvals = db.query(User).filter(User.is_approved == False).count()
-    admins_count = db.query(User).filter(User.role == UserRole.ADMIN).count()
-    mentors_count = db.query(User).filter(User.role == UserRole.MENTOR).count()
-    members_count = db.query(User).filter(User.role == UserRole.MEMBER).count()
-    
-    # Count ventures
-    total_ventures = db.query(Venture).count()
-    
-    # Count applications by status
-    total_applications = db.query(Application).count()
-    pending_applications = db.query(Application).filter(Application.status == ApplicationStatus.SUBMITTED).count()
-    approved_applications = db.query(Application).filter(Application.status == ApplicationStatus.APPROVED).count()
-    
-    # Count mentor matches
-    total_matches = db.query(MentorMatch).count()
-    active_matches = db.query(MentorMatch).filter(MentorMatch.status == MatchStatus.ACCEPTED).count()
-    
-    # Count programs
-    total_programs = db.query(Program).count()
-    active_programs = db.query(Program).filter(Program.is_active == 1).count()
-    
-    # Count resources
-    total_resources = db.query(Resource).count()
-    
-    return {
-        "users": {
-            "total": total_users,
-            "approved": approved_users,
-            "pending_approval": pending_approvals,
-            "admins": admins_count,
-            "mentors": mentors_count,
-            "members": members_count
-        },
-        "ventures": {
-            "total": total_ventures
-        },
-        "applications": {
-            "total": total_applications,
-            "pending": pending_applications,
-            "approved": approved_applications
-        },
-        "mentor_matches": {
-            "total": total_matches,
-            "active": active_matches
-        },
-        "programs": {
-            "total": total_programs,
-            "active": active_programs
-        },
-        "resources": {
-            "total": total_resources
-        }
-    }
+    return await platform_metrics(db)
 
 @router.get("/users", response_model=List[UserResponse], summary="Get all users")
-def get_all_users(
-    db: Session = Depends(get_db),
+async def get_all_users(
+    page: CursorPage = Depends(),
+    fields: FieldSet = Depends(sparse_fields(UserResponse, User)),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(admin_required)
 ):
     """Get list of all users for admin management"""
-    users = db.query(User).all()
-    return users
+    query = fields.apply(select(User), User.user_id)
+    return typed_response(fields.adapter, await page.fetch(db, query, User.user_id), page.response)
 
 @router.get("/users/pending", response_model=List[UserResponse], summary="Get pending user approvals")
-def get_pending_users(
-    db: Session = Depends(get_db),
+async def get_pending_users(
+    page: CursorPage = Depends(),
+    fields: FieldSet = Depends(sparse_fields(UserResponse, User)),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(admin_required)
 ):
     """Get list of users pending approval"""
-    users = db.query(User).filter(User.is_approved == False).all()
-    return users
+    query = fields.apply(select(User).where(User.is_approved == False), User.created_at, User.user_id)
+    return typed_response(fields.adapter, await page.fetch(db, query, User.created_at, User.user_id), page.response)
 
 @router.put("/users/{user_id}", response_model=UserResponse, summary="Update user (Admin)")
-def update_user_by_admin(
+async def update_user_by_admin(
     user_id: int,
     user_update: UserUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(admin_required)
 ):
     """Update any user's profile as admin"""
-    user = db.query(User).filter(User.user_id == user_id).first()
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
-    
-    for field, value in user_update.dict(exclude_unset=True).items():
-        setattr(user, field, value)
-    
-    db.commit()
-    db.refresh(user)
+    try:
+        user = await update_returning(db, User, user_id, user_update.dict(exclude_unset=True))
+        if not user:
+            raise HTTPException(status_code=404, detail="User not found")
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        raise HTTPException(status_code=400, detail="Email already registered")
+    await invalidate_principal(user_id)
     return user
 
 @router.delete("/users/{user_id}", summary="Deactivate user")
-def deactivate_user(
+async def deactivate_user(
     user_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(admin_required)
 ):
     """Deactivate a user account"""
     if user_id == current_user.user_id:
         raise HTTPException(status_code=400, detail="Cannot deactivate your own account")
         
-    user = db.query(User).filter(User.user_id == user_id).first()
+    user = await db.scalar(select(User).where(User.user_id == user_id))
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     
     # For now, we'll delete the user. In production, you might want to add an 'is_active' field
-    db.delete(user)
-    db.commit()
+    await db.delete(user)
+    await db.commit()
+    await invalidate_principal(user_id)
     return {"message": "User deactivated successfully"}
 
-@router.get("/applications", summary="Get all applications")
-def get_all_applications(
-    db: Session = Depends(get_db),
+@router.get("/applications", response_model=List[ApplicationResponse], summary="Get all applications")
+async def get_all_applications(
+    page: CursorPage = Depends(),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(admin_required)
 ):
     """Get all applications for admin review"""
-    applications = db.query(Application).all()
-    return applications
+    rows = await page.fetch(db, select(Application), Application.application_id)
+    return typed_response(APPLICATION_LIST, rows, page.response)
 
-@router.put("/applications/{application_id}/review", summary="Review application")
-def review_application(
+@router.get("/export/{entity}", summary="Export users or applications", description="Stream every matching row as NDJSON or CSV, in primary key order.")
+async def export_entity(
+    entity: ExportEntity,
+    export_format: DataFormat = Query(DataFormat.NDJSON, alias="format"),
+    fields: Optional[str] = Query(None, description="Comma-separated columns to export; defaults to every field of the list endpoint"),
+    role: Optional[UserRole] = Query(None, description="users only"),
+    is_approved: Optional[bool] = Query(None, description="users only; false matches /admin/users/pending"),
+    status: Optional[ApplicationStatus] = Query(None, description="applications only"),
+    current_user: User = Depends(admin_required)
+):
+    model, schema = EXPORTS[entity]
+    fieldset = parse_fields(schema, model, fields)
+    query = select(*[getattr(model, name) for name in fieldset.selected])
+    if entity is ExportEntity.USERS:
+        if status is not None:
+            raise HTTPException(status_code=400, detail="status only applies to applications")
+        if role is not None:
+            query = query.where(User.role == role)
+        if is_approved is not None:
+            query = query.where(User.is_approved == is_approved)
+        query = query.order_by(User.user_id)
+    else:
+        if role is not None or is_approved is not None:
+            raise HTTPException(status_code=400, detail="role and is_approved only apply to users")
+        if status is not None:
+            query = query.where(Application.status == status)
+        query = query.order_by(Application.application_id)
+
+    return StreamingResponse(
+        stream_export(query, fieldset.selected, export_format),
+        media_type=MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="{entity.value}.{export_format.value}"'}
+    )
+
+@router.post("/import/{entity}", response_model=ImportReport, summary="Bulk import users, resources or programs", description="Create one row per CSV or NDJSON record in the request body. Records that fail validation, repeat an email or name a missing category are reported by number; the rest are created.")
+async def import_entity(
+    entity: ImportEntity,
+    request: Request,
+    data_format: Optional[DataFormat] = Query(None, alias="format", description="Defaults to csv for a text/csv body, ndjson otherwise"),
+    approve: bool = Query(False, description="users only; approve every imported account"),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(admin_required)
+):
+    if approve and entity is not ImportEntity.USERS:
+        raise HTTPException(status_code=400, detail="approve only applies to users")
+    if data_format is None:
+        content_type = request.headers.get("content-type", "")
+        data_format = DataFormat.CSV if content_type.startswith("text/csv") else DataFormat.NDJSON
+    try:
+        records = list(read_records(await request.body(), data_format))
+    except (UnicodeDecodeError, csv.Error) as exc:
+        raise HTTPException(status_code=400, detail=f"Unreadable {data_format.value} upload: {exc}")
+    if len(records) > settings.bulk_import_max_rows:
+        raise HTTPException(status_code=413, detail=f"At most {settings.bulk_import_max_rows} records per import")
+
+    schema, importer, tag = IMPORTS[entity]
+    valid, errors = validate_records(schema, records)
+    created, rejected = await importer(db, valid, current_user, approve)
+    await db.commit()
+    if tag and created:
+        await invalidate(tag)
+    errors = sorted(errors + rejected, key=lambda error: error.row)
+    return ImportReport(received=len(records), created=created, errors=errors)
+
+@router.put("/applications/{application_id}/review", response_model=ApplicationResponse, summary="Review application")
+async def review_application(
     application_id: int,
     application_update: ApplicationUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(admin_required)
 ):
     """Review and update application status"""
-    application = db.query(Application).filter(Application.application_id == application_id).first()
-    if not application:
-        raise HTTPException(status_code=404, detail="Application not found")
-
     # Update application status and reviewer info
+    review = {}
     if application_update.status:
-        application.status = application_update.status
-        application.reviewed_by = current_user.user_id
-        application.reviewed_at = func.now()
+        review = {
+            "status": application_update.status,
+            "reviewed_by": current_user.user_id,
+            "reviewed_at": func.now()
+        }
+    application = await update_returning(db, Application, application_id, review)
+    if not application:
+        raise HTTPException(status_code=404, detail="Application not found")
 
-    db.commit()
-    db.refresh(application)
+    await db.commit()
     return application
 
 @router.put("/users/{user_id}/approve", response_model=UserResponse, summary="Approve user account")
-def approve_user(
+async def approve_user(
     user_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(admin_required)
 ):
     """Approve a user account"""
-    user = db.query(User).filter(User.user_id == user_id).first()
+    user = await update_returning(db, User, user_id, {"is_approved": True})
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
-    user.is_approved = True
-    db.commit()
-    db.refresh(user)
+    await db.commit()
+    await invalidate_principal(user_id)
     return user
 
 @router.put("/users/{user_id}/reject", summary="Reject user account")
-def reject_user(
+async def reject_user(
     user_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(admin_required)
 ):
     """Reject a user account (delete it)"""
     if user_id == current_user.user_id:
         raise HTTPException(status_code=400, detail="Cannot reject your own account")
 
-    user = db.query(User).filter(User.user_id == user_id).first()
+    user = await db.scalar(select(User).where(User.user_id == user_id))
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
-    db.delete(user)
-    db.commit()
-    return {"message": "User account rejected and deleted"}
\ No newline at end of file
+    await db.delete(user)
+    await db.commit()
+    await invalidate_principal(user_id)
+    return {"message": "User account rejected and deleted"}
+
+@router.get("/cache/stats", summary="Get cache statistics")
+async def get_cache_stats(current_user: User = Depends(admin_required)):
+    """Get hit/miss counters for the per-process caches"""
+    return {**principal_cache_stats(), "platform_metrics": metrics_cache.stats(), "responses": response_cache_stats()}
+
+@router.get("/db/pool", summary="Get database pool statistics")
+async def get_pool_stats(current_user: User = Depends(admin_required)):
+    """Get connection pool occupancy, overflow and checkout wait times"""
+    def snapshot(db_engine):
+        pool = db_engine.sync_engine.pool
+        return pool.metrics.snapshot(pool)
+
+    return {
+        "primary": snapshot(engine),
+        "replica": snapshot(replica_engine) if replica_engine else None
+    }
\ No newline at end of file
@@ -1,90 +1,77 @@
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from ..database import get_db
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..database import get_db, get_read_db
 from ..models import User, Application, Venture
 from ..schemas import ApplicationCreate, ApplicationResponse, ApplicationUpdate
+from ..ownership import get_owned, owner_clause, update_owned
+from ..writes import insert_returning
 from ..security import get_current_user
 
 router = APIRouter(prefix="/applications", tags=["applications"])
 
 @router.post("/", response_model=ApplicationResponse, summary="Create application", description="Submit an application for a venture.")
-def create_application(
+async def create_application(
     application: ApplicationCreate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
-    # Verify venture exists and belongs to user
-    venture = db.query(Venture).filter(
+    # Insert only for the user's own venture; one application per venture is enforced by a unique index
+    new_application = await insert_returning(db, Application, {
+        "venture_id": application.venture_id,
+        "program_id": application.program_id
+    }, guard=(
         Venture.venture_id == application.venture_id,
-        Venture.member_id == current_user.user_id
-    ).first()
-    if not venture:
-        raise HTTPException(status_code=404, detail="Venture not found or does not belong to you")
-
-    # Check if user already applied to this venture
-    existing_application = db.query(Application).filter(
-        Application.venture_id == application.venture_id
-    ).first()
-    if existing_application:
+        owner_clause(Venture, current_user.user_id)
+    ), conflict=(Application.venture_id,))
+    if new_application is None:
+        owns_venture = await db.scalar(select(Venture.venture_id).where(
+            Venture.venture_id == application.venture_id,
+            owner_clause(Venture, current_user.user_id)
+        ))
+        if not owns_venture:
+            raise HTTPException(status_code=404, detail="Venture not found or does not belong to you")
         raise HTTPException(status_code=400, detail="You have already applied to this venture")
-
-    new_application = Application(
-        venture_id=application.venture_id,
-        program_id=application.program_id
-    )
-    db.add(new_application)
-    db.commit()
-    db.refresh(new_application)
+    await db.commit()
     return new_application
 
 @router.get("/", response_model=list[ApplicationResponse], summary="Get user's applications", description="Retrieve all applications submitted by the authenticated user.")
-def get_user_applications(
+async def get_user_applications(
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
-    # Get ventures owned by user, then get applications for those ventures
-    user_ventures = db.query(Venture).filter(Venture.member_id == current_user.user_id).all()
-    venture_ids = [v.venture_id for v in user_ventures]
-
-    applications = db.query(Application).filter(
-        Application.venture_id.in_(venture_ids)
-    ).all()
+    # Applications for ventures owned by the user, joined in one query
+    applications = (await db.scalars(
+        select(Application).join(Venture, Application.venture_id == Venture.venture_id)
+        .where(Venture.member_id == current_user.user_id)
+    )).all()
     return applications
 
 @router.get("/{application_id}", response_model=ApplicationResponse, summary="Get application by ID", description="Retrieve a specific application by its ID.")
-def get_application(
+async def get_application(
     application_id: int,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
-    application = db.query(Application).filter(Application.application_id == application_id).first()
-    if not application:
-        raise HTTPException(status_code=404, detail="Application not found")
-
-    # Check if user owns the venture this application is for
-    if application.venture.member_id != current_user.user_id:
-        raise HTTPException(status_code=403, detail="Not authorized to access this application")
+    application = await get_owned(
+        db, Application, application_id, current_user.user_id,
+        not_found="Application not found",
+        forbidden="Not authorized to access this application"
+    )
 
     return application
 
 @router.put("/{application_id}", response_model=ApplicationResponse, summary="Update application status", description="Update an application's status.")
-def update_application(
+async def update_application(
     application_id: int,
     application_update: ApplicationUpdate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
-    application = db.query(Application).filter(Application.application_id == application_id).first()
-    if not application:
-        raise HTTPException(status_code=404, detail="Application not found")
-
-    # Check if user owns the venture this application is for
-    if application.venture.member_id != current_user.user_id:
-        raise HTTPException(status_code=403, detail="Not authorized to update this application")
-
-    update_data = application_update.dict(exclude_unset=True)
-    for field, value in update_data.items():
-        setattr(application, field, value)
-    db.commit()
-    db.refresh(application)
-    return application
\ No newline at end of file
+    application = await update_owned(
+        db, Application, application_id, current_user.user_id, application_update.dict(exclude_unset=True),
+        not_found="Application not found",
+        forbidden="Not authorized to update this application"
+    )
+    await db.commit()
+    return application
@@ -1,44 +1,51 @@
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from ..database import get_db
 from ..models.user import User
 from ..models.enums import UserRole
 from ..schemas import UserCreate, UserLogin, UserResponse
-from ..security import hash_password, verify_password, create_access_token
+from ..writes import insert_returning
+from ..security import hash_password_async, verify_password_async, create_access_token, invalidate_principal
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
 @router.post("/signup", response_model=UserResponse, summary="Register a new user", description="Create a new user account with the provided details. The email must be unique across all users. Passwords are securely hashed before storage.", responses={201: {"description": "User created successfully", "model": UserResponse}, 400: {"description": "Email already registered"}})
-def signup(user: UserCreate, db: Session = Depends(get_db)):
-    # Check if email exists
-    db_user = db.query(User).filter(User.email == user.email).first()
-    if db_user:
-        raise HTTPException(status_code=400, detail="Email already registered")
-    
+async def signup(user: UserCreate, db: AsyncSession = Depends(get_db)):
     # Hash password
-    hashed = hash_password(user.password)
+    hashed = await hash_password_async(user.password)
     
-    # Create user - admins are approved by default, others need approval
+    # Create user - admins are approved by default, others need approval.
+    # The unique email index rejects duplicates, so no pre-check is needed.
     is_approved = user.role == UserRole.ADMIN
-    new_user = User(
-        first_name=user.first_name,
-        last_name=user.last_name,
-        email=user.email,
-        password_hash=hashed,
-        role=user.role,
-        is_approved=is_approved,
-        profile_details=user.profile_details
-    )
-    db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+    new_user = await insert_returning(db, User, {
+        "first_name": user.first_name,
+        "last_name": user.last_name,
+        "email": user.email,
+        "password_hash": hashed,
+        "role": user.role,
+        "is_approved": is_approved,
+        "profile_details": user.profile_details
+    }, conflict=(User.email,))
+    if new_user is None:
+        raise HTTPException(status_code=400, detail="Email already registered")
+    await db.commit()
     return new_user
 
 @router.post("/login", summary="Authenticate user", description="Login with email and password. Returns a JWT access token and user information if credentials are valid.", responses={200: {"description": "Successful login", "content": {"application/json": {"example": {"access_token": "eyJ0eXAiOiJKV1QiLCJhbGciOiJIUzI1NiJ9...", "token_type": "bearer", "user": {"id": 1, "name": "John Doe", "email": "john@example.com", "role": "entrepreneur"}}}}}, 401: {"description": "Invalid credentials"}})
-def login(user: UserLogin, db: Session = Depends(get_db)):
-    db_user = db.query(User).filter(User.email == user.email).first()
-    if not db_user or not verify_password(user.password, db_user.password_hash):
+async def login(user: UserLogin, db: AsyncSession = Depends(get_db)):
+    db_user = await db.scalar(select(User).where(User.email == user.email))
+    if not db_user:
         raise HTTPException(status_code=401, detail="Invalid credentials")
+    valid, new_hash = await verify_password_async(user.password, db_user.password_hash)
+    if not valid:
+        raise HTTPException(status_code=401, detail="Invalid credentials")
+
+    # Transparently upgrade hashes created with a different bcrypt cost
+    if new_hash:
+        db_user.password_hash = new_hash
+        await db.commit()
+        await invalidate_principal(db_user.user_id)
     
     # Add extra claims in the token
     token_data = {
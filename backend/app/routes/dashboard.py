@@ -1,7 +1,10 @@
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from pydantic import TypeAdapter
+from sqlalchemy import distinct, func, select, true
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
 from typing import List
-from ..database import get_db
+from ..database import get_read_db
 from ..models.user import User
 from ..models.ventures import Venture
 from ..models.applications import Application
@@ -15,123 +18,137 @@ from ..schemas.applications import ApplicationResponse
 from ..schemas.mentor_matches import MentorMatchResponse
 from ..schemas.resources import ResourceResponse
 from ..schemas.programs import ProgramResponse
+from ..schemas.dashboard import MemberDashboardResponse, MentorDashboardResponse
+from ..fieldsets import FieldSet, sparse_fields
+from ..pagination import CursorPage
+from ..serialization import typed_response
 from ..security import get_current_user
 
 router = APIRouter(prefix="/dashboard", tags=["dashboard"])
 
-@router.get("/member", summary="Member Dashboard")
-def get_member_dashboard(
+MEMBER_DASHBOARD = TypeAdapter(MemberDashboardResponse)
+MENTOR_DASHBOARD = TypeAdapter(MentorDashboardResponse)
+
+def _member_overview(member_id: int):
+    """Dashboard stats as one aggregate row, left-joined to the member's ventures and their applications."""
+    stats = select(
+        func.count(distinct(Venture.venture_id)).label("total_ventures"),
+        func.count(Application.application_id).label("total_applications"),
+        func.count(Application.application_id).filter(Application.status == ApplicationStatus.SUBMITTED).label("pending_applications"),
+        func.count(Application.application_id).filter(Application.status == ApplicationStatus.APPROVED).label("approved_applications"),
+    ).select_from(Venture).outerjoin(Application, Application.venture_id == Venture.venture_id).where(
+        Venture.member_id == member_id
+    ).subquery()
+    connections = select(func.count().label("mentor_connections")).where(
+        MentorMatch.member_id == member_id, MentorMatch.status == MatchStatus.ACCEPTED
+    ).subquery()
+    # The aggregate side always has one row, so a member with no ventures still gets stats
+    return select(stats, connections, Venture, Application).select_from(stats).join(connections, true()).outerjoin(
+        Venture, Venture.member_id == member_id
+    ).outerjoin(Application, Application.venture_id == Venture.venture_id).order_by(
+        Venture.venture_id, Application.application_id
+    )
+
+def _mentor_overview(mentor_id: int):
+    """Dashboard stats as one aggregate row, left-joined to every match of the mentor."""
+    stats = select(
+        func.count().filter(MentorMatch.status == MatchStatus.ACCEPTED).label("total_mentees"),
+        func.count().filter(MentorMatch.status == MatchStatus.PENDING).label("pending_requests"),
+    ).where(MentorMatch.mentor_id == mentor_id).subquery()
+    shared = select(func.count().label("resources_shared")).where(Resource.uploaded_by_id == mentor_id).subquery()
+    return select(stats, shared, MentorMatch).select_from(stats).join(shared, true()).outerjoin(
+        MentorMatch, MentorMatch.mentor_id == mentor_id
+    ).order_by(MentorMatch.match_id)
+
+@router.get("/member", response_model=MemberDashboardResponse, summary="Member Dashboard")
+async def get_member_dashboard(
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Member dashboard with ventures, applications, and mentor matches"""
     if current_user.role != UserRole.MEMBER:
         raise HTTPException(status_code=403, detail="Member access only")
-    
-    # Get user's ventures
-    ventures = db.query(Venture).filter(Venture.member_id == current_user.user_id).all()
-    venture_ids = [v.venture_id for v in ventures]
-    
-    # Get applications for user's ventures
-    applications = db.query(Application).filter(
-        Application.venture_id.in_(venture_ids)
-    ).all() if venture_ids else []
-    
-    # Get mentor matches where user is the member
-    mentor_matches = db.query(MentorMatch).filter(
+
+    rows = (await db.execute(_member_overview(current_user.user_id))).all()
+    ventures = list({row.Venture.venture_id: row.Venture for row in rows if row.Venture is not None}.values())
+    applications = [row.Application for row in rows if row.Application is not None]
+
+    mentor_matches = (await db.scalars(select(MentorMatch).where(
         MentorMatch.member_id == current_user.user_id
-    ).all()
-    
-    # Get available programs
-    available_programs = db.query(Program).filter(Program.is_active == 1).all()
-    
-    return {
+    ))).all()
+    available_programs = (await db.scalars(select(Program).where(Program.is_active == 1))).all()
+
+    return typed_response(MEMBER_DASHBOARD, {
         "user": current_user,
         "ventures": ventures,
         "applications": applications,
         "mentor_matches": mentor_matches,
         "available_programs": available_programs,
-        "stats": {
-            "total_ventures": len(ventures),
-            "total_applications": len(applications),
-            "pending_applications": len([app for app in applications if app.status == ApplicationStatus.SUBMITTED]),
-            "approved_applications": len([app for app in applications if app.status == ApplicationStatus.APPROVED]),
-            "mentor_connections": len([match for match in mentor_matches if match.status == MatchStatus.ACCEPTED])
-        }
-    }
+        "stats": rows[0]
+    })
 
-@router.get("/mentor", summary="Mentor Dashboard")
-def get_mentor_dashboard(
+@router.get("/mentor", response_model=MentorDashboardResponse, summary="Mentor Dashboard")
+async def get_mentor_dashboard(
+    page: CursorPage = Depends(),
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
-    """Mentor dashboard with mentee requests and shared resources"""
+    """Mentor dashboard with mentee requests and shared resources; potential_mentees is paginated"""
     if current_user.role != UserRole.MENTOR:
         raise HTTPException(status_code=403, detail="Mentor access only")
-    
-    # Get mentor matches where user is the mentor
-    mentor_matches = db.query(MentorMatch).filter(
-        MentorMatch.mentor_id == current_user.user_id
-    ).all()
-    
-    # Get pending mentee requests
-    pending_requests = db.query(MentorMatch).filter(
-        MentorMatch.mentor_id == current_user.user_id,
-        MentorMatch.status == MatchStatus.PENDING
-    ).all()
-    
-    # Get resources shared by this mentor
-    shared_resources = db.query(Resource).filter(
+
+    rows = (await db.execute(_mentor_overview(current_user.user_id))).all()
+    mentor_matches = [row.MentorMatch for row in rows if row.MentorMatch is not None]
+
+    shared_resources = (await db.scalars(select(Resource).where(
         Resource.uploaded_by_id == current_user.user_id
-    ).all()
-    
-    # Get all members for potential mentoring
-    potential_mentees = db.query(User).filter(User.role == UserRole.MEMBER).all()
-    
-    return {
+    ))).all()
+    potential_mentees = await page.fetch(db, select(User).where(User.role == UserRole.MEMBER), User.user_id)
+
+    return typed_response(MENTOR_DASHBOARD, {
         "user": current_user,
         "mentor_matches": mentor_matches,
-        "pending_requests": pending_requests,
+        "pending_requests": [match for match in mentor_matches if match.status == MatchStatus.PENDING],
         "shared_resources": shared_resources,
         "potential_mentees": potential_mentees,
-        "stats": {
-            "total_mentees": len([match for match in mentor_matches if match.status == MatchStatus.ACCEPTED]),
-            "pending_requests": len(pending_requests),
-            "resources_shared": len(shared_resources)
-        }
-    }
+        "stats": rows[0]
+    }, page.response)
 
 @router.get("/mentees", response_model=List[UserResponse], summary="Get all mentees for mentor")
-def get_mentees_for_mentor(
+async def get_mentees_for_mentor(
+    page: CursorPage = Depends(),
+    fields: FieldSet = Depends(sparse_fields(UserResponse, User)),
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get all members/mentees with their venture profiles for mentor to view"""
     if current_user.role != UserRole.MENTOR:
         raise HTTPException(status_code=403, detail="Mentor access only")
     
     # Get all members (potential mentees)
-    mentees = db.query(User).filter(User.role == UserRole.MEMBER).all()
-    return mentees
+    query = fields.apply(select(User).where(User.role == UserRole.MEMBER), User.user_id)
+    return typed_response(fields.adapter, await page.fetch(db, query, User.user_id), page.response)
 
 @router.get("/mentees/{mentee_id}/ventures", response_model=List[VentureResponse], summary="View mentee's ventures")
-def get_mentee_ventures(
+async def get_mentee_ventures(
     mentee_id: int,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """View a specific mentee's ventures"""
     if current_user.role != UserRole.MENTOR:
         raise HTTPException(status_code=403, detail="Mentor access only")
     
     # Verify mentee exists and is a member
-    mentee = db.query(User).filter(
+    mentee = await db.scalar(select(User).where(
         User.user_id == mentee_id,
         User.role == UserRole.MEMBER
-    ).first()
+    ))
     if not mentee:
         raise HTTPException(status_code=404, detail="Mentee not found")
     
     # Get mentee's ventures
-    ventures = db.query(Venture).filter(Venture.member_id == mentee_id).all()
+    ventures = (await db.scalars(
+        select(Venture).where(Venture.member_id == mentee_id).options(selectinload(Venture.member))
+    )).all()
     return ventures
\ No newline at end of file
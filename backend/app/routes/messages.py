@@ -1,71 +1,165 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from ..database import get_db
-from ..models import User, Message
-from ..schemas import MessageCreate, MessageResponse, MessageUpdate
+from fastapi import APIRouter, Depends, HTTPException, Query
+from datetime import datetime
+from typing import Optional
+from sqlalchemy import case, func, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..core.broker import notify_users
+from ..database import get_db, get_read_db
+from ..models import Conversation, User, Message
+from ..models.conversations import participants
+from ..schemas import MessageCreate, MessageResponse, MessageUpdate, InboxEntry
+from ..pagination import CursorPage, time_window
+from ..writes import insert_returning, update_returning
 from ..security import get_current_user
 
 router = APIRouter(prefix="/messages", tags=["messages"])
 
 @router.post("/", response_model=MessageResponse, summary="Send message", description="Send a message to another user.")
-def send_message(
+async def send_message(
     message: MessageCreate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
-    # Verify receiver exists
-    receiver = db.query(User).filter(User.user_id == message.receiver_id).first()
-    if not receiver:
-        raise HTTPException(status_code=404, detail="Receiver not found")
-
     # Prevent sending message to self
     if message.receiver_id == current_user.user_id:
         raise HTTPException(status_code=400, detail="Cannot send message to yourself")
 
-    new_message = Message(
-        sender_id=current_user.user_id,
-        receiver_id=message.receiver_id,
-        content=message.content
+    # Create or touch the conversation, only if the receiver exists
+    user_low_id, user_high_id = participants(current_user.user_id, message.receiver_id)
+    conversation = await insert_returning(
+        db, Conversation, {"user_low_id": user_low_id, "user_high_id": user_high_id},
+        guard=(User.user_id == message.receiver_id,),
+        conflict=("user_low_id", "user_high_id"),
+        update={"last_message_at": func.now()}
+    )
+    if conversation is None:
+        raise HTTPException(status_code=404, detail="Receiver not found")
+    new_message = await insert_returning(db, Message, {
+        "sender_id": current_user.user_id,
+        "receiver_id": message.receiver_id,
+        "conversation_id": conversation.conversation_id,
+        "content": message.content
+    })
+    await db.commit()
+    # Both sides get it, so the sender's other open sessions stay in sync too
+    await notify_users(
+        (new_message.sender_id, new_message.receiver_id),
+        {"type": "message", "message": MessageResponse.model_validate(new_message).model_dump(mode="json")}
     )
-    db.add(new_message)
-    db.commit()
-    db.refresh(new_message)
     return new_message
 
 @router.get("/", response_model=list[MessageResponse], summary="Get user's messages", description="Retrieve all messages for the authenticated user.")
-def get_user_messages(
+async def get_user_messages(
+    page: CursorPage = Depends(),
+    since: Optional[datetime] = Query(None, description="Only messages sent at or after this time"),
+    until: Optional[datetime] = Query(None, description="Only messages sent before this time"),
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
-    messages = db.query(Message).filter(
+    query = select(Message).where(
         (Message.sender_id == current_user.user_id) | (Message.receiver_id == current_user.user_id)
-    ).order_by(Message.sent_at.desc()).all()
-    return messages
+    )
+    query = time_window(query, Message.sent_at, since, until, db.get_bind().dialect.name)
+    return await page.fetch(db, query, Message.sent_at, Message.message_id, descending=True)
+
+@router.get("/inbox", response_model=list[InboxEntry], summary="Get inbox", description="One entry per conversation partner with the latest message and the number of unread messages from them, most recent activity first.")
+async def get_inbox(
+    page: CursorPage = Depends(),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db)
+):
+    me = current_user.user_id
+    peer_id = case((Conversation.user_low_id == me, Conversation.user_high_id), else_=Conversation.user_low_id)
+    # Per conversation: its newest message from the (conversation_id, sent_at) index and
+    # the unread count from the partial unread index, so the cost follows the number of
+    # conversations on the page rather than the user's whole message history
+    latest = select(Message.message_id).where(
+        Message.conversation_id == Conversation.conversation_id
+    ).order_by(Message.sent_at.desc(), Message.message_id.desc()).limit(1).correlate(Conversation).scalar_subquery()
+    unread = select(func.count()).select_from(Message).where(
+        Message.receiver_id == me, Message.sender_id == peer_id, Message.is_read == False
+    ).correlate(Conversation).scalar_subquery()
+    query = select(Conversation, Message, peer_id.label("peer_id"), unread.label("unread_count")).join(
+        Message, Message.message_id == latest
+    ).where(or_(Conversation.user_low_id == me, Conversation.user_high_id == me))
+    order_by = (Conversation.last_message_at, Conversation.conversation_id)
+    rows = (await db.execute(
+        page.apply(query, *order_by, descending=True, dialect=db.get_bind().dialect.name)
+    )).all()
+    conversations = page.finish([row[0] for row in rows], *order_by)
+    return [
+        {"peer_id": peer, "last_message": message, "last_activity": message.sent_at, "unread_count": unread}
+        for _, message, peer, unread in rows[:len(conversations)]
+    ]
 
 @router.get("/conversation/{other_user_id}", response_model=list[MessageResponse], summary="Get conversation", description="Retrieve conversation between current user and another user.")
-def get_conversation(
+async def get_conversation(
     other_user_id: int,
+    page: CursorPage = Depends(),
+    since: Optional[datetime] = Query(None, description="Only messages sent at or after this time"),
+    until: Optional[datetime] = Query(None, description="Only messages sent before this time"),
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
-    # Verify other user exists
-    other_user = db.query(User).filter(User.user_id == other_user_id).first()
-    if not other_user:
+    # A single range scan of (conversation_id, sent_at) for the pair's conversation
+    user_low_id, user_high_id = participants(current_user.user_id, other_user_id)
+    conversation_id = select(Conversation.conversation_id).where(
+        Conversation.user_low_id == user_low_id, Conversation.user_high_id == user_high_id
+    ).scalar_subquery()
+    query = select(Message).where(Message.conversation_id == conversation_id)
+    query = time_window(query, Message.sent_at, since, until, db.get_bind().dialect.name)
+    messages = await page.fetch(db, query, Message.sent_at, Message.message_id)
+    # Only an empty page needs to tell an unknown user apart from an empty conversation
+    if not messages and not await db.scalar(select(User.user_id).where(User.user_id == other_user_id)):
         raise HTTPException(status_code=404, detail="User not found")
-
-    messages = db.query(Message).filter(
-        ((Message.sender_id == current_user.user_id) & (Message.receiver_id == other_user_id)) |
-        ((Message.sender_id == other_user_id) & (Message.receiver_id == current_user.user_id))
-    ).order_by(Message.sent_at).all()
     return messages
 
+@router.post("/conversation/{other_user_id}/read", summary="Mark conversation as read", description="Mark every unread message from another user as read, optionally only up to a message ID and/or timestamp.")
+async def mark_conversation_read(
+    other_user_id: int,
+    up_to_message_id: Optional[int] = None,
+    up_to: Optional[datetime] = None,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    # One UPDATE over the partial unread index instead of a request per message
+    statement = update(Message).where(
+        Message.receiver_id == current_user.user_id,
+        Message.sender_id == other_user_id,
+        Message.is_read == False
+    ).values(is_read=True).execution_options(synchronize_session=False)
+    if up_to_message_id is not None:
+        statement = statement.where(Message.message_id <= up_to_message_id)
+    if up_to is not None:
+        statement = statement.where(Message.sent_at <= up_to)
+    message_ids = (await db.scalars(statement.returning(Message.message_id))).all()
+    await db.commit()
+    if message_ids:
+        await notify_users(
+            (other_user_id,),
+            {"type": "read", "reader_id": current_user.user_id, "message_ids": list(message_ids)}
+        )
+    return {"marked_read": len(message_ids)}
+
+@router.get("/unread-count", summary="Get unread message count", description="Number of unread messages addressed to the authenticated user.")
+async def get_unread_count(
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db)
+):
+    # Answered from the partial index on unread messages
+    unread = await db.scalar(select(func.count()).select_from(Message).where(
+        Message.receiver_id == current_user.user_id,
+        Message.is_read == False
+    ))
+    return {"unread_count": unread}
+
 @router.get("/{message_id}", response_model=MessageResponse, summary="Get message by ID", description="Retrieve a specific message by its ID.")
-def get_message(
+async def get_message(
     message_id: int,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
-    message = db.query(Message).filter(Message.message_id == message_id).first()
+    message = await db.scalar(select(Message).where(Message.message_id == message_id))
     if not message:
         raise HTTPException(status_code=404, detail="Message not found")
 
@@ -76,34 +170,38 @@ def get_message(
     return message
 
 @router.put("/{message_id}", response_model=MessageResponse, summary="Update message read status", description="Mark a message as read.")
-def update_message(
+async def update_message(
     message_id: int,
     message_update: MessageUpdate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
-    message = db.query(Message).filter(Message.message_id == message_id).first()
+    # Only the receiver may change the read state
+    message = await update_returning(
+        db, Message, message_id, message_update.dict(exclude_unset=True),
+        Message.receiver_id == current_user.user_id
+    )
     if not message:
-        raise HTTPException(status_code=404, detail="Message not found")
-
-    # Check if user is the receiver
-    if message.receiver_id != current_user.user_id:
+        exists = await db.scalar(select(Message.message_id).where(Message.message_id == message_id))
+        if not exists:
+            raise HTTPException(status_code=404, detail="Message not found")
         raise HTTPException(status_code=403, detail="Not authorized to update this message")
 
-    update_data = message_update.dict(exclude_unset=True)
-    for field, value in update_data.items():
-        setattr(message, field, value)
-    db.commit()
-    db.refresh(message)
+    await db.commit()
+    if message.is_read:
+        await notify_users(
+            (message.sender_id,),
+            {"type": "read", "reader_id": current_user.user_id, "message_ids": [message.message_id]}
+        )
     return message
 
 @router.delete("/{message_id}", summary="Delete message", description="Delete a message.")
-def delete_message(
+async def delete_message(
     message_id: int,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
-    message = db.query(Message).filter(Message.message_id == message_id).first()
+    message = await db.scalar(select(Message).where(Message.message_id == message_id))
     if not message:
         raise HTTPException(status_code=404, detail="Message not found")
 
@@ -111,6 +209,17 @@ def delete_message(
     if message.sender_id != current_user.user_id:
         raise HTTPException(status_code=403, detail="Not authorized to delete this message")
 
-    db.delete(message)
-    db.commit()
+    await db.delete(message)
+    await db.flush()
+    # The inbox orders by last_message_at but shows the newest remaining message,
+    # so move the conversation back to that message's time in the same transaction
+    newest = select(func.max(Message.sent_at)).where(
+        Message.conversation_id == Conversation.conversation_id
+    ).correlate(Conversation).scalar_subquery()
+    await db.execute(
+        update(Conversation).where(Conversation.conversation_id == message.conversation_id)
+        .values(last_message_at=func.coalesce(newest, Conversation.created_at))
+        .execution_options(synchronize_session=False)
+    )
+    await db.commit()
     return {"message": "Message deleted successfully"}
\ No newline at end of file
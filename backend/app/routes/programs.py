@@ -1,85 +1,105 @@
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
-from ..database import get_db
+from ..database import get_db, get_read_db
 from ..models.programs import Program
 from ..models.user import User
 from ..models.enums import UserRole
 from ..schemas.programs import ProgramCreate, ProgramUpdate, ProgramResponse
+from ..http_cache import Conditional, make_etag, row_etag
+from ..pagination import CursorPage
+from ..response_cache import CachedRoute, cached, invalidate
+from ..writes import insert_returning, update_returning
 from ..security import get_current_user
 
-router = APIRouter(prefix="/programs", tags=["programs"])
+router = APIRouter(prefix="/programs", tags=["programs"], route_class=CachedRoute)
 
 @router.post("/", response_model=ProgramResponse, summary="Create new program (Admin only)")
-def create_program(
+async def create_program(
     program: ProgramCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     if current_user.role != UserRole.ADMIN:
         raise HTTPException(status_code=403, detail="Only admins can create programs")
     
-    new_program = Program(
-        title=program.title,
-        description=program.description,
-        requirements=program.requirements,
-        benefits=program.benefits,
-        duration=program.duration,
-        application_deadline=program.application_deadline,
-        created_by=current_user.user_id
-    )
-    db.add(new_program)
-    db.commit()
-    db.refresh(new_program)
+    new_program = await insert_returning(db, Program, {
+        "title": program.title,
+        "description": program.description,
+        "requirements": program.requirements,
+        "benefits": program.benefits,
+        "duration": program.duration,
+        "application_deadline": program.application_deadline,
+        "created_by": current_user.user_id
+    })
+    await db.commit()
+    await invalidate("programs")
     return new_program
 
 @router.get("/", response_model=List[ProgramResponse], summary="Get all active programs")
-def get_programs(db: Session = Depends(get_db)):
-    programs = db.query(Program).filter(Program.is_active == 1).all()
-    return programs
+@cached("programs")
+async def get_programs(
+    page: CursorPage = Depends(),
+    conditional: Conditional = Depends(),
+    db: AsyncSession = Depends(get_read_db)
+):
+    # Programs are never deleted and every edit (deactivation included) bumps
+    # updated_at, so these three aggregates change whenever any page could
+    version = (await db.execute(
+        select(func.count(), func.max(Program.program_id), func.max(Program.updated_at))
+    )).one()
+    if conditional.fresh(make_etag("programs", *version, page.cursor, page.limit), version[2]):
+        return conditional.not_modified()
+    query = select(Program).where(Program.is_active == 1)
+    return await page.fetch(db, query, Program.program_id)
 
 @router.get("/{program_id}", response_model=ProgramResponse, summary="Get program by ID")
-def get_program(program_id: int, db: Session = Depends(get_db)):
-    program = db.query(Program).filter(Program.program_id == program_id).first()
+@cached("programs")
+async def get_program(
+    program_id: int,
+    conditional: Conditional = Depends(),
+    db: AsyncSession = Depends(get_read_db)
+):
+    program = await db.scalar(select(Program).where(Program.program_id == program_id))
     if not program:
         raise HTTPException(status_code=404, detail="Program not found")
+    if conditional.fresh(row_etag(program), program.updated_at):
+        return conditional.not_modified()
     return program
 
 @router.put("/{program_id}", response_model=ProgramResponse, summary="Update program (Admin only)")
-def update_program(
+async def update_program(
     program_id: int,
     program_update: ProgramUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     if current_user.role != UserRole.ADMIN:
         raise HTTPException(status_code=403, detail="Only admins can update programs")
     
-    program = db.query(Program).filter(Program.program_id == program_id).first()
+    program = await update_returning(db, Program, program_id, program_update.dict(exclude_unset=True))
     if not program:
         raise HTTPException(status_code=404, detail="Program not found")
     
-    for field, value in program_update.dict(exclude_unset=True).items():
-        setattr(program, field, value)
-    
-    db.commit()
-    db.refresh(program)
+    await db.commit()
+    await invalidate("programs")
     return program
 
 @router.delete("/{program_id}", summary="Delete program (Admin only)")
-def delete_program(
+async def delete_program(
     program_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     if current_user.role != UserRole.ADMIN:
         raise HTTPException(status_code=403, detail="Only admins can delete programs")
     
-    program = db.query(Program).filter(Program.program_id == program_id).first()
+    # Soft delete by setting is_active to 0
+    program = await update_returning(db, Program, program_id, {"is_active": 0})
     if not program:
         raise HTTPException(status_code=404, detail="Program not found")
     
-    # Soft delete by setting is_active to 0
-    program.is_active = 0
-    db.commit()
+    await db.commit()
+    await invalidate("programs")
     return {"message": "Program deleted successfully"}
\ No newline at end of file
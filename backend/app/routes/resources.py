@@ -1,118 +1,158 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from ..database import get_db
+from fastapi import APIRouter, Depends, HTTPException, Query
+from typing import Optional
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..database import get_db, get_read_db
 from ..models import User, Resource, ResourceCategory
 from ..models.enums import UserRole
 from ..schemas import (
     ResourceCreate, ResourceResponse, ResourceUpdate,
-    ResourceCategoryCreate, ResourceCategoryResponse
+    ResourceCategoryCreate, ResourceCategoryResponse, ResourceSearchResult
 )
+from ..http_cache import Conditional, make_etag, row_etag
+from ..ownership import get_owned, update_owned
+from ..fieldsets import FieldSet, sparse_fields
+from ..pagination import CursorPage
+from ..response_cache import CachedRoute, cached, invalidate
+from ..search import search_resources
+from ..serialization import typed_response
+from ..writes import insert_returning
 from ..security import get_current_user
 
-router = APIRouter(prefix="/resources", tags=["resources"])
+router = APIRouter(prefix="/resources", tags=["resources"], route_class=CachedRoute)
 
 # Resource Categories
 @router.post("/categories/", response_model=ResourceCategoryResponse, summary="Create resource category", description="Create a new resource category (Admin only).")
-def create_resource_category(
+async def create_resource_category(
     category: ResourceCategoryCreate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     # Only admins can create resource categories
     if current_user.role != UserRole.ADMIN:
         raise HTTPException(status_code=403, detail="Only admins can create resource categories")
         
-    new_category = ResourceCategory(category_name=category.category_name)
-    db.add(new_category)
-    db.commit()
-    db.refresh(new_category)
+    new_category = await insert_returning(
+        db, ResourceCategory, {"category_name": category.category_name},
+        conflict=(ResourceCategory.category_name,)
+    )
+    if new_category is None:
+        raise HTTPException(status_code=400, detail="Resource category already exists")
+    await db.commit()
+    await invalidate("resource_categories")
     return new_category
 
 @router.get("/categories/", response_model=list[ResourceCategoryResponse], summary="Get all resource categories", description="Retrieve all resource categories.")
-def get_resource_categories(db: Session = Depends(get_db)):
-    categories = db.query(ResourceCategory).all()
+@cached("resource_categories")
+async def get_resource_categories(conditional: Conditional = Depends(), db: AsyncSession = Depends(get_read_db)):
+    # Categories are only ever added, so their count and highest id version the list
+    version = (await db.execute(select(func.count(), func.max(ResourceCategory.category_id)))).one()
+    if conditional.fresh(make_etag("resourcecategories", *version)):
+        return conditional.not_modified()
+    categories = (await db.scalars(select(ResourceCategory))).all()
     return categories
 
 # Resources
 @router.post("/", response_model=ResourceResponse, summary="Create resource", description="Create a new resource (Mentors and Admins only).")
-def create_resource(
+async def create_resource(
     resource: ResourceCreate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     # Only mentors and admins can create resources
     if current_user.role not in [UserRole.MENTOR, UserRole.ADMIN]:
         raise HTTPException(status_code=403, detail="Only mentors and admins can create resources")
     
-    # Verify category exists
-    category = db.query(ResourceCategory).filter(ResourceCategory.category_id == resource.category_id).first()
-    if not category:
+    # Insert only if the category exists
+    new_resource = await insert_returning(db, Resource, {
+        "category_id": resource.category_id,
+        "uploaded_by_id": current_user.user_id,
+        "title": resource.title,
+        "description": resource.description,
+        "url": resource.url
+    }, guard=(ResourceCategory.category_id == resource.category_id,))
+    if new_resource is None:
         raise HTTPException(status_code=404, detail="Resource category not found")
-
-    new_resource = Resource(
-        category_id=resource.category_id,
-        uploaded_by_id=current_user.user_id,
-        title=resource.title,
-        description=resource.description,
-        url=resource.url
-    )
-    db.add(new_resource)
-    db.commit()
-    db.refresh(new_resource)
+    await db.commit()
+    await invalidate("resources")
     return new_resource
 
 @router.get("/", response_model=list[ResourceResponse], summary="Get all resources", description="Retrieve all resources.")
-def get_resources(
-    skip: int = 0,
-    limit: int = 100,
+@cached("resources")
+async def get_resources(
+    page: CursorPage = Depends(),
+    fields: FieldSet = Depends(sparse_fields(ResourceResponse, Resource)),
     category_id: int = None,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
-    query = db.query(Resource)
+    query = fields.apply(select(Resource), Resource.created_at, Resource.resource_id)
     if category_id:
-        query = query.filter(Resource.category_id == category_id)
-    resources = query.offset(skip).limit(limit).all()
-    return resources
+        query = query.where(Resource.category_id == category_id)
+    rows = await page.fetch(db, query, Resource.created_at, Resource.resource_id)
+    return typed_response(fields.adapter, rows, page.response)
+
+@router.get("/search", response_model=list[ResourceSearchResult], summary="Search resources", description="Full-text search over resource titles and descriptions, best matches first, with matched terms wrapped in <mark> tags.")
+async def search_resources_endpoint(
+    q: str = Query(..., min_length=1, max_length=200, description="Search terms; quoted phrases and -exclusions are honoured on PostgreSQL"),
+    page: CursorPage = Depends(),
+    category_id: Optional[int] = None,
+    db: AsyncSession = Depends(get_read_db)
+):
+    rows = await search_resources(db, page, q, category_id)
+    return [
+        {
+            **ResourceResponse.model_validate(row.Resource).model_dump(),
+            "rank": row.rank,
+            "title_highlight": row.title_highlight,
+            "description_highlight": row.description_highlight if row.Resource.description else None
+        }
+        for row in rows
+    ]
 
 @router.get("/{resource_id}", response_model=ResourceResponse, summary="Get resource by ID", description="Retrieve a specific resource by its ID.")
-def get_resource(resource_id: int, db: Session = Depends(get_db)):
-    resource = db.query(Resource).filter(Resource.resource_id == resource_id).first()
+@cached("resources")
+async def get_resource(
+    resource_id: int,
+    conditional: Conditional = Depends(),
+    db: AsyncSession = Depends(get_read_db)
+):
+    resource = await db.scalar(select(Resource).where(Resource.resource_id == resource_id))
     if not resource:
         raise HTTPException(status_code=404, detail="Resource not found")
+    # Resources have no updated_at, so edits are only visible to the ETag
+    if conditional.fresh(row_etag(resource)):
+        return conditional.not_modified()
     return resource
 
 @router.put("/{resource_id}", response_model=ResourceResponse, summary="Update resource", description="Update a resource's information.")
-def update_resource(
+async def update_resource(
     resource_id: int,
     resource_update: ResourceUpdate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
-    resource = db.query(Resource).filter(Resource.resource_id == resource_id).first()
-    if not resource:
-        raise HTTPException(status_code=404, detail="Resource not found")
-    if resource.uploaded_by_id != current_user.user_id:
-        raise HTTPException(status_code=403, detail="Not authorized to update this resource")
-
-    update_data = resource_update.dict(exclude_unset=True)
-    for field, value in update_data.items():
-        setattr(resource, field, value)
-    db.commit()
-    db.refresh(resource)
+    resource = await update_owned(
+        db, Resource, resource_id, current_user.user_id, resource_update.dict(exclude_unset=True),
+        not_found="Resource not found",
+        forbidden="Not authorized to update this resource"
+    )
+    await db.commit()
+    await invalidate("resources")
     return resource
 
 @router.delete("/{resource_id}", summary="Delete resource", description="Delete a resource.")
-def delete_resource(
+async def delete_resource(
     resource_id: int,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
-    resource = db.query(Resource).filter(Resource.resource_id == resource_id).first()
-    if not resource:
-        raise HTTPException(status_code=404, detail="Resource not found")
-    if resource.uploaded_by_id != current_user.user_id:
-        raise HTTPException(status_code=403, detail="Not authorized to delete this resource")
+    resource = await get_owned(
+        db, Resource, resource_id, current_user.user_id,
+        not_found="Resource not found",
+        forbidden="Not authorized to delete this resource"
+    )
 
-    db.delete(resource)
-    db.commit()
+    await db.delete(resource)
+    await db.commit()
+    await invalidate("resources")
     return {"message": "Resource deleted successfully"}
\ No newline at end of file
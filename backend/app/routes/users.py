@@ -1,78 +1,105 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from ..database import get_db
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..database import get_db, get_read_db
 from ..models import User
 from ..models.enums import UserRole
 from ..schemas import UserResponse, UserUpdate
-from ..security import get_current_user
+from ..fieldsets import FieldSet, sparse_fields
+from ..pagination import CursorPage
+from ..serialization import typed_response
+from ..writes import update_returning
+from ..user_search import search_users
+from ..security import get_current_user, invalidate_principal, hash_password_async
 
 router = APIRouter(prefix="/users", tags=["users"])
 
 @router.get("/me", response_model=UserResponse, summary="Get current user profile", description="Retrieve the profile of the currently authenticated user.")
-def get_current_user_profile(current_user: User = Depends(get_current_user)):
+async def get_current_user_profile(current_user: User = Depends(get_current_user)):
     return current_user
 
 @router.put("/me", response_model=UserResponse, summary="Update current user profile", description="Update the profile information of the currently authenticated user.")
-def update_current_user_profile(
+async def update_current_user_profile(
     user_update: UserUpdate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
-    update_data = user_update.dict(exclude_unset=True)
-    for field, value in update_data.items():
-        setattr(current_user, field, value)
-    db.commit()
-    db.refresh(current_user)
-    return current_user
+    try:
+        user = await update_returning(db, User, current_user.user_id, user_update.dict(exclude_unset=True))
+        await db.commit()
+    except IntegrityError:
+        # The only unique column a user can change is their email
+        await db.rollback()
+        raise HTTPException(status_code=400, detail="Email already registered")
+    await invalidate_principal(current_user.user_id)
+    return user
 
 @router.get("/mentors", response_model=list[UserResponse], summary="Get all mentors", description="Retrieve a list of all mentors for members to view.")
-def get_all_mentors(
-    db: Session = Depends(get_db),
+async def get_all_mentors(
+    page: CursorPage = Depends(),
+    fields: FieldSet = Depends(sparse_fields(UserResponse, User)),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get all mentors - available to all authenticated users"""
-    mentors = db.query(User).filter(User.role == UserRole.MENTOR).all()
-    return mentors
+    query = fields.apply(select(User).where(User.role == UserRole.MENTOR), User.user_id)
+    return typed_response(fields.adapter, await page.fetch(db, query, User.user_id), page.response)
+
+@router.get("/search", response_model=list[UserResponse], summary="Search users", description="Prefix and fuzzy search on first name, last name and email, best match first. Admins search every user, everyone else searches mentors.")
+async def search_user_directory(
+    q: str = Query(..., min_length=2, max_length=100, description="Start of a name or email, or a name with typos"),
+    role: Optional[UserRole] = Query(None),
+    is_approved: Optional[bool] = Query(None),
+    page: CursorPage = Depends(),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: User = Depends(get_current_user)
+):
+    # Non-admins get the same view as /users/mentors
+    if current_user.role != UserRole.ADMIN:
+        if role not in (None, UserRole.MENTOR):
+            raise HTTPException(status_code=403, detail="Admin access required")
+        role = UserRole.MENTOR
+    return await search_users(db, page, q, role=role, is_approved=is_approved)
 
 @router.get("/{user_id}", response_model=UserResponse, summary="Get user by ID", description="Retrieve a user's profile by their user ID.")
-def get_user_by_id(user_id: int, db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.user_id == user_id).first()
+async def get_user_by_id(user_id: int, db: AsyncSession = Depends(get_read_db)):
+    user = await db.scalar(select(User).where(User.user_id == user_id))
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     return user
 
 @router.put("/{user_id}/reset-password", summary="Reset user password (Admin only)")
-def reset_user_password(
+async def reset_user_password(
     user_id: int,
     new_password: str,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Reset a user's password (Admin only)"""
     if current_user.role != UserRole.ADMIN:
         raise HTTPException(status_code=403, detail="Admin access required")
     
-    user = db.query(User).filter(User.user_id == user_id).first()
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
-    
     # Hash the new password
-    from ..security import hash_password
-    user.password_hash = hash_password(new_password)
-    db.commit()
+    password_hash = await hash_password_async(new_password)
+    if await update_returning(db, User, user_id, {"password_hash": password_hash}) is None:
+        raise HTTPException(status_code=404, detail="User not found")
+    await db.commit()
+    await invalidate_principal(user_id)
     
     return {"message": "Password reset successfully"}
 
 @router.get("/", response_model=list[UserResponse], summary="Get all users", description="Retrieve a list of all users. Requires admin privileges.")
-def get_all_users(
-    skip: int = 0,
-    limit: int = 100,
+async def get_all_users(
+    page: CursorPage = Depends(),
+    fields: FieldSet = Depends(sparse_fields(UserResponse, User)),
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     # Only admins can view all users
     if current_user.role != UserRole.ADMIN:
         raise HTTPException(status_code=403, detail="Admin access required")
     
-    users = db.query(User).offset(skip).limit(limit).all()
-    return users
\ No newline at end of file
+    query = fields.apply(select(User), User.user_id)
+    return typed_response(fields.adapter, await page.fetch(db, query, User.user_id), page.response)
\ No newline at end of file
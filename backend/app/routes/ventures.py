@@ -1,82 +1,84 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from ..database import get_db
+from fastapi import APIRouter, Depends
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+from sqlalchemy.orm.attributes import set_committed_value
+from ..database import get_db, get_read_db
 from ..models import User, Venture
 from ..schemas import VentureCreate, VentureResponse, VentureUpdate
+from ..ownership import get_owned, update_owned
+from ..writes import insert_returning
 from ..security import get_current_user
 
 router = APIRouter(prefix="/ventures", tags=["ventures"])
 
 @router.post("/", response_model=VentureResponse, summary="Create a new venture", description="Create a new venture for the authenticated user.")
-def create_venture(
+async def create_venture(
     venture: VentureCreate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
-    new_venture = Venture(
-        member_id=current_user.user_id,
-        venture_name=venture.venture_name,
-        description=venture.description
-    )
-    db.add(new_venture)
-    db.commit()
-    db.refresh(new_venture)
+    new_venture = await insert_returning(db, Venture, {
+        "member_id": current_user.user_id,
+        "venture_name": venture.venture_name,
+        "description": venture.description
+    })
+    await db.commit()
+    # The response embeds the owner, which is the caller
+    set_committed_value(new_venture, "member", current_user)
     return new_venture
 
 @router.get("/", response_model=list[VentureResponse], summary="Get user's ventures", description="Retrieve all ventures created by the authenticated user.")
-def get_user_ventures(
+async def get_user_ventures(
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
-    ventures = db.query(Venture).filter(Venture.member_id == current_user.user_id).all()
+    ventures = (await db.scalars(
+        select(Venture).where(Venture.member_id == current_user.user_id).options(selectinload(Venture.member))
+    )).all()
     return ventures
 
 @router.get("/{venture_id}", response_model=VentureResponse, summary="Get venture by ID", description="Retrieve a specific venture by its ID.")
-def get_venture(
+async def get_venture(
     venture_id: int,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
-    venture = db.query(Venture).filter(Venture.venture_id == venture_id).first()
-    if not venture:
-        raise HTTPException(status_code=404, detail="Venture not found")
-    # Check if user owns this venture
-    if venture.member_id != current_user.user_id:
-        raise HTTPException(status_code=403, detail="Not authorized to access this venture")
-    return venture
+    return await get_owned(
+        db, Venture, venture_id, current_user.user_id,
+        not_found="Venture not found",
+        forbidden="Not authorized to access this venture",
+        options=(selectinload(Venture.member),)
+    )
 
 @router.put("/{venture_id}", response_model=VentureResponse, summary="Update venture", description="Update a venture's information.")
-def update_venture(
+async def update_venture(
     venture_id: int,
     venture_update: VentureUpdate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
-    venture = db.query(Venture).filter(Venture.venture_id == venture_id).first()
-    if not venture:
-        raise HTTPException(status_code=404, detail="Venture not found")
-    if venture.member_id != current_user.user_id:
-        raise HTTPException(status_code=403, detail="Not authorized to update this venture")
-
-    update_data = venture_update.dict(exclude_unset=True)
-    for field, value in update_data.items():
-        setattr(venture, field, value)
-    db.commit()
-    db.refresh(venture)
+    venture = await update_owned(
+        db, Venture, venture_id, current_user.user_id, venture_update.dict(exclude_unset=True),
+        not_found="Venture not found",
+        forbidden="Not authorized to update this venture"
+    )
+    await db.commit()
+    set_committed_value(venture, "member", current_user)
     return venture
 
 @router.delete("/{venture_id}", summary="Delete venture", description="Delete a venture.")
-def delete_venture(
+async def delete_venture(
     venture_id: int,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
-    venture = db.query(Venture).filter(Venture.venture_id == venture_id).first()
-    if not venture:
-        raise HTTPException(status_code=404, detail="Venture not found")
-    if venture.member_id != current_user.user_id:
-        raise HTTPException(status_code=403, detail="Not authorized to delete this venture")
+    venture = await get_owned(
+        db, Venture, venture_id, current_user.user_id,
+        not_found="Venture not found",
+        forbidden="Not authorized to delete this venture"
+    )
 
-    db.delete(venture)
-    db.commit()
-    return {"message": "Venture deleted successfully"}
\ No newline at end of file
+    await db.delete(venture)
+    await db.commit()
+    return {"message": "Venture deleted successfully"}
@@ -0,0 +1,29 @@
+import asyncio
+from fastapi import APIRouter, Depends, WebSocket
+from ..core.broker import broker, user_channel
+from ..models import User
+from ..security import get_websocket_user
+
+router = APIRouter(prefix="/ws", tags=["websocket"])
+
+@router.websocket("/messages")
+async def message_events(websocket: WebSocket, current_user: User = Depends(get_websocket_user)):
+    """Push messaging events to the authenticated user.
+
+    Events are JSON objects with a "type":
+    - "message": a message was sent to or by the user ("message" holds it)
+    - "read": a peer read some of the user's messages ("reader_id", "message_ids")
+    Clients only need to send to keep the connection alive; incoming frames are ignored.
+    """
+    await websocket.accept()
+    async with broker.subscribe(user_channel(current_user.user_id)) as subscription:
+        async def forward():
+            while True:
+                await websocket.send_json(await subscription.get())
+
+        sender = asyncio.create_task(forward())
+        try:
+            while (await websocket.receive())["type"] != "websocket.disconnect":
+                pass
+        finally:
+            sender.cancel()
@@ -1,8 +1,10 @@
 from .user import UserCreate, UserLogin, UserResponse, UserUpdate
-from .ventures import VentureCreate, VentureResponse, VentureUpdate
-from .resources import ResourceCreate, ResourceResponse, ResourceUpdate, ResourceCategoryCreate, ResourceCategoryResponse
+from .ventures import VentureCreate, VentureResponse, VentureSummary, VentureUpdate
+from .resources import ResourceCreate, ResourceResponse, ResourceUpdate, ResourceCategoryCreate, ResourceCategoryResponse, ResourceSearchResult
 from .applications import ApplicationCreate, ApplicationResponse, ApplicationUpdate
 from .milestones import MilestoneCreate, MilestoneResponse, MilestoneUpdate
 from .mentor_matches import MentorMatchCreate, MentorMatchResponse, MentorMatchUpdate
-from .messages import MessageCreate, MessageResponse, MessageUpdate
-from .programs import ProgramCreate, ProgramResponse, ProgramUpdate
\ No newline at end of file
+from .messages import MessageCreate, MessageResponse, MessageUpdate, InboxEntry
+from .programs import ProgramCreate, ProgramResponse, ProgramUpdate
+from .dashboard import MemberDashboardResponse, MemberDashboardStats, MentorDashboardResponse, MentorDashboardStats
+from .imports import ImportReport, ImportRowError
\ No newline at end of file
@@ -0,0 +1,36 @@
+from pydantic import BaseModel
+from typing import List
+from .user import UserResponse
+from .ventures import VentureSummary
+from .applications import ApplicationResponse
+from .mentor_matches import MentorMatchResponse
+from .resources import ResourceResponse
+from .programs import ProgramResponse
+
+class MemberDashboardStats(BaseModel):
+    total_ventures: int
+    total_applications: int
+    pending_applications: int
+    approved_applications: int
+    mentor_connections: int
+
+class MemberDashboardResponse(BaseModel):
+    user: UserResponse
+    ventures: List[VentureSummary]
+    applications: List[ApplicationResponse]
+    mentor_matches: List[MentorMatchResponse]
+    available_programs: List[ProgramResponse]
+    stats: MemberDashboardStats
+
+class MentorDashboardStats(BaseModel):
+    total_mentees: int
+    pending_requests: int
+    resources_shared: int
+
+class MentorDashboardResponse(BaseModel):
+    user: UserResponse
+    mentor_matches: List[MentorMatchResponse]
+    pending_requests: List[MentorMatchResponse]
+    shared_resources: List[ResourceResponse]
+    potential_mentees: List[UserResponse]
+    stats: MentorDashboardStats
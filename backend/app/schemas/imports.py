@@ -0,0 +1,11 @@
+from pydantic import BaseModel
+from typing import List
+
+class ImportRowError(BaseModel):
+    row: int  # 1-based record number in the upload, not counting the CSV header
+    errors: List[str]
+
+class ImportReport(BaseModel):
+    received: int
+    created: int
+    errors: List[ImportRowError]
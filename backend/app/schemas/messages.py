@@ -36,4 +36,27 @@ class MessageResponse(BaseModel):
         }
 
 class MessageUpdate(BaseModel):
-    is_read: Optional[bool] = None
\ No newline at end of file
+    is_read: Optional[bool] = None
+
+class InboxEntry(BaseModel):
+    peer_id: int
+    last_message: MessageResponse
+    last_activity: datetime
+    unread_count: int
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "peer_id": 2,
+                "last_message": {
+                    "message_id": 7,
+                    "sender_id": 2,
+                    "receiver_id": 1,
+                    "content": "See you at the pitch session.",
+                    "sent_at": "2023-01-02T09:30:00Z",
+                    "is_read": False
+                },
+                "last_activity": "2023-01-02T09:30:00Z",
+                "unread_count": 3
+            }
+        }
\ No newline at end of file
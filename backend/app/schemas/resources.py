@@ -67,4 +67,26 @@ class ResourceResponse(BaseModel):
 class ResourceUpdate(BaseModel):
     title: Optional[str] = None
     description: Optional[str] = None
-    url: Optional[str] = None
\ No newline at end of file
+    url: Optional[str] = None
+
+class ResourceSearchResult(ResourceResponse):
+    rank: float
+    title_highlight: str
+    description_highlight: Optional[str]
+
+    class Config:
+        from_attributes = True
+        json_schema_extra = {
+            "example": {
+                "resource_id": 1,
+                "category_id": 1,
+                "uploaded_by_id": 1,
+                "title": "Startup Funding Guide",
+                "description": "Comprehensive guide to funding options for startups",
+                "url": "https://example.com/funding-guide",
+                "created_at": "2023-01-01T00:00:00Z",
+                "rank": 0.6,
+                "title_highlight": "Startup <mark>Funding</mark> Guide",
+                "description_highlight": "Comprehensive guide to <mark>funding</mark> options for startups"
+            }
+        }
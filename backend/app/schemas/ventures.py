@@ -15,12 +15,17 @@ class VentureCreate(BaseModel):
             }
         }
 
-class VentureResponse(BaseModel):
+class VentureSummary(BaseModel):
     venture_id: int
     member_id: int
     venture_name: str
     description: Optional[str]
     created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+class VentureResponse(VentureSummary):
     member: Optional[UserResponse] = None
 
     class Config:
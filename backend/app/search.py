@@ -0,0 +1,106 @@
+"""Ranked full-text search over the resource library.
+
+Matching and ranking run on the search index declared with the Resource
+model: PostgreSQL's weighted tsvector column (title ranks above
+description) or SQLite's FTS5 table. At most MAX_RANKED_MATCHES of the
+newest matching resources are ranked, which keeps very common terms from
+scoring most of the library. Results are keyset-paginated by (rank,
+resource_id), and matched terms are highlighted only for the rows on the
+returned page, since highlighting re-reads each document.
+"""
+import re
+from typing import Optional
+
+from sqlalchemy import Float, Integer, column, func, literal_column, select, table
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .models import Resource
+from .pagination import CursorPage
+
+HIGHLIGHT_START = "<mark>"
+HIGHLIGHT_STOP = "</mark>"
+SNIPPET_WORDS = 32
+# Broad queries rank only the newest matches; both backends walk matches in
+# ID order cheaply, while ranking costs a read of every candidate document
+MAX_RANKED_MATCHES = 10000
+# Title matches count this many times more than description matches on SQLite,
+# in line with the A/B weights of the PostgreSQL vector
+TITLE_WEIGHT, DESCRIPTION_WEIGHT = 10.0, 2.5
+
+resources_fts = table("resources_fts", column("rowid", Integer), column("title"), column("description"))
+search_vector = literal_column("resources.search_vector")
+
+def fts5_query(text: str) -> Optional[str]:
+    """Quote each word so user input can never be read as FTS5 query syntax; terms are ANDed."""
+    terms = re.findall(r"\w+", text)
+    return " ".join(f'"{term}"' for term in terms) or None
+
+def _postgres_matches(text: str, category_id: Optional[int]):
+    query = func.websearch_to_tsquery(literal_column("'english'"), text)
+    candidates = select(Resource.resource_id).where(search_vector.op("@@")(query))
+    if category_id is not None:
+        candidates = candidates.where(Resource.category_id == category_id)
+    # Pick the candidates in a query of their own so only they are ranked
+    candidates = candidates.order_by(Resource.resource_id.desc()).limit(MAX_RANKED_MATCHES).subquery("candidates")
+    matches = select(
+        Resource.resource_id.label("resource_id"),
+        func.ts_rank_cd(search_vector, query, type_=Float).label("rank")
+    ).join(candidates, Resource.resource_id == candidates.c.resource_id)
+    return matches, query
+
+def _postgres_results(page, query):
+    options = f"StartSel={HIGHLIGHT_START}, StopSel={HIGHLIGHT_STOP}"
+    return select(
+        Resource, page.c.resource_id, page.c.rank,
+        func.ts_headline(literal_column("'english'"), Resource.title, query, f"{options}, HighlightAll=true").label("title_highlight"),
+        func.ts_headline(
+            literal_column("'english'"), func.coalesce(Resource.description, ""), query,
+            f"{options}, MaxWords={SNIPPET_WORDS}, MinWords={SNIPPET_WORDS // 2}"
+        ).label("description_highlight")
+    ).join(page, Resource.resource_id == page.c.resource_id)
+
+def _sqlite_matches(text: str, category_id: Optional[int]):
+    query = fts5_query(text)
+    # bm25() is lower for better matches; negate it so both backends rank descending
+    matches = select(
+        resources_fts.c.rowid.label("resource_id"),
+        (-func.bm25(literal_column("resources_fts"), TITLE_WEIGHT, DESCRIPTION_WEIGHT, type_=Float)).label("rank")
+    ).where(literal_column("resources_fts").op("MATCH")(query))
+    if category_id is not None:
+        matches = matches.join(Resource, Resource.resource_id == resources_fts.c.rowid).where(
+            Resource.category_id == category_id
+        )
+    # FTS5 returns matches in rowid order without sorting, and bm25() runs only for rows that pass the limit
+    return matches.order_by(resources_fts.c.rowid.desc()).limit(MAX_RANKED_MATCHES), query
+
+def _sqlite_results(page, query):
+    # highlight() and snippet() only work in a statement that runs the MATCH,
+    # so the page's rows are matched again, this time by rowid
+    fts = literal_column("resources_fts")
+    return select(
+        Resource, page.c.resource_id, page.c.rank,
+        func.highlight(fts, 0, HIGHLIGHT_START, HIGHLIGHT_STOP).label("title_highlight"),
+        func.snippet(fts, 1, HIGHLIGHT_START, HIGHLIGHT_STOP, "…", SNIPPET_WORDS).label("description_highlight")
+    ).select_from(resources_fts).join(page, resources_fts.c.rowid == page.c.resource_id).join(
+        Resource, Resource.resource_id == resources_fts.c.rowid
+    ).where(fts.op("MATCH")(query))
+
+async def search_resources(db: AsyncSession, page: CursorPage, text: str, category_id: Optional[int] = None) -> list:
+    """Rows of (Resource, resource_id, rank, title_highlight, description_highlight), best match first."""
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        matches, query = _postgres_matches(text, category_id)
+        results = _postgres_results
+    else:
+        if fts5_query(text) is None:
+            return []
+        matches, query = _sqlite_matches(text, category_id)
+        results = _sqlite_results
+
+    ranked = matches.subquery("ranked")
+    order_by = (ranked.c.rank, ranked.c.resource_id)
+    page_rows = page.apply(select(*order_by), *order_by, descending=True, dialect=dialect).subquery("page")
+    rows = (await db.execute(
+        results(page_rows, query).order_by(page_rows.c.rank.desc(), page_rows.c.resource_id.desc())
+    )).all()
+    return page.finish(rows, *order_by)
@@ -1,20 +1,44 @@
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Query, WebSocket, WebSocketException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from passlib.context import CryptContext
 from jose import JWTError, jwt
+import time
 from datetime import datetime, timedelta
-from sqlalchemy.orm import Session
+from typing import Optional
+from sqlalchemy import inspect, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import make_transient_to_detached
+from .core.cache import TTLCache
 from .core.config import settings
-from .database import get_db
+from .core.shared import shared_store
+from .core.hashing import HashingOverloaded, hash_password, verify_and_update, run_hashing, run_hashing_bulk
+from .database import SessionLocal, get_db
 from .models import User
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+def _hashing_unavailable():
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Authentication service busy, please retry",
+        headers={"Retry-After": "1"}
+    )
 
-def hash_password(password: str) -> str:
-    return pwd_context.hash(password)
+async def hash_password_async(password: str) -> str:
+    try:
+        return await run_hashing(hash_password, password)
+    except HashingOverloaded:
+        raise _hashing_unavailable()
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password[:72], hashed_password)
+async def hash_passwords_async(passwords: list) -> list:
+    try:
+        return await run_hashing_bulk(passwords)
+    except HashingOverloaded:
+        raise _hashing_unavailable()
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> tuple[bool, Optional[str]]:
+    """Verify off the event loop; also returns a replacement hash if the bcrypt cost changed."""
+    try:
+        return await run_hashing(verify_and_update, plain_password, hashed_password)
+    except HashingOverloaded:
+        raise _hashing_unavailable()
 
 def create_access_token(data: dict):
     to_encode = data.copy()
@@ -25,21 +49,92 @@ def create_access_token(data: dict):
 
 security = HTTPBearer()
 
-def get_current_user(
+# Per-process caches consulted before decoding the JWT and loading the user row.
+# Users are cached as plain column snapshots so no session state leaks between requests.
+token_cache = TTLCache(settings.principal_cache_size, settings.principal_cache_ttl)
+principal_cache = TTLCache(settings.principal_cache_size, settings.principal_cache_ttl)
+
+def _drop_principals(user_ids: list):
+    for user_id in user_ids:
+        principal_cache.delete(int(user_id))
+
+shared_store.on_invalidate("principals", _drop_principals)
+
+async def invalidate_principal(user_id: int):
+    """Drop a cached user, in every worker, so the next request reloads it from the database."""
+    await shared_store.invalidate("principals", int(user_id))
+
+def principal_cache_stats() -> dict:
+    return {"principals": principal_cache.stats(), "tokens": token_cache.stats()}
+
+def decode_access_token(token: str) -> dict:
+    payload = token_cache.get(token)
+    if payload is not None:
+        return payload
+    payload = jwt.decode(token, settings.jwt_secret, algorithms=[settings.jwt_algorithm])
+    # Never keep a token around longer than it stays valid
+    exp = payload.get("exp")
+    ttl = exp - time.time() if exp else None
+    token_cache.set(token, payload, ttl=ttl)
+    return payload
+
+async def _load_principal(db: AsyncSession, user_id: int):
+    snapshot = principal_cache.get(user_id)
+    if snapshot is not None:
+        # Rebuild a persistent instance from the snapshot without a round trip
+        user = User(**snapshot)
+        make_transient_to_detached(user)
+        db.add(user)
+        return user
+
+    user = await db.scalar(select(User).where(User.user_id == user_id))
+    if user is not None:
+        principal_cache.set(user_id, {
+            attr.key: getattr(user, attr.key) for attr in inspect(User).column_attrs
+        })
+    return user
+
+async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ) -> User:
     try:
-        payload = jwt.decode(credentials.credentials, settings.jwt_secret, algorithms=[settings.jwt_algorithm])
+        payload = decode_access_token(credentials.credentials)
         user_id: str = payload.get("sub")
         if user_id is None:
             raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid authentication credentials")
     except JWTError:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid authentication credentials")
 
-    user = db.query(User).filter(User.user_id == int(user_id)).first()
+    user = await _load_principal(db, int(user_id))
     if user is None:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
     if not user.is_approved:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Account not approved yet")
-    return user
\ No newline at end of file
+    # Lets the session remember who wrote, for read-your-writes routing
+    db.info["user_id"] = user.user_id
+    return user
+
+async def get_websocket_user(websocket: WebSocket, token: Optional[str] = Query(None)) -> User:
+    """get_current_user for WebSocket routes.
+
+    Browsers cannot set headers on a WebSocket handshake, so the JWT may also
+    come as ?token=. The session is closed before returning so an open socket
+    does not pin a pooled connection.
+    """
+    scheme, _, header_token = websocket.headers.get("authorization", "").partition(" ")
+    token = token or (header_token if scheme.lower() == "bearer" else None)
+    if not token:
+        raise WebSocketException(code=status.WS_1008_POLICY_VIOLATION, reason="Missing credentials")
+    try:
+        user_id = decode_access_token(token).get("sub")
+    except JWTError:
+        user_id = None
+    if user_id is None:
+        raise WebSocketException(code=status.WS_1008_POLICY_VIOLATION, reason="Invalid authentication credentials")
+
+    async with SessionLocal() as db:
+        user = await _load_principal(db, int(user_id))
+    if user is None or not user.is_approved:
+        raise WebSocketException(code=status.WS_1008_POLICY_VIOLATION, reason="Not authorized")
+    return user
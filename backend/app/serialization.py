@@ -0,0 +1,29 @@
+"""JSON responses built straight from a precompiled Pydantic TypeAdapter.
+
+Returning ORM rows with a response_model makes FastAPI validate them into
+models, dump those to Python primitives and only then encode the JSON. For
+large lists, typed_response() validates the rows with an adapter built once
+at import and lets pydantic-core write the JSON bytes in the same pass. The
+route keeps its response_model for the OpenAPI schema; FastAPI skips it
+because a Response is returned.
+"""
+from functools import lru_cache
+from typing import Any, List, Optional
+from fastapi import Response
+from pydantic import ConfigDict, TypeAdapter, create_model
+
+@lru_cache(maxsize=256)
+def list_adapter(schema, fields: Optional[tuple] = None) -> TypeAdapter:
+    """Adapter for a list of schema, or of a copy of schema cut down to fields (in schema order)."""
+    if fields is not None:
+        schema = create_model(
+            f"{schema.__name__}Fields",
+            __config__=ConfigDict(from_attributes=True),
+            **{name: (info.annotation, info) for name, info in schema.model_fields.items() if name in fields}
+        )
+    return TypeAdapter(List[schema])
+
+def typed_response(adapter: TypeAdapter, value: Any, response: Optional[Response] = None) -> Response:
+    """Serialize value through adapter; headers already set on response (e.g. X-Next-Cursor) are kept."""
+    body = adapter.dump_json(adapter.validate_python(value, from_attributes=True))
+    return Response(content=body, media_type="application/json", headers=dict(response.headers) if response else None)
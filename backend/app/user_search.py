@@ -0,0 +1,400 @@
+"""People search: prefix and fuzzy matching on first name, last name and email.
+
+Every user is matched against one lower-cased " first last email" string.
+A user is a prefix match when a word of it starts with the query, and a
+fuzzy match when the query's trigrams are close enough to the words'
+(pg_trgm's word similarity, at least WORD_SIMILARITY_THRESHOLD). Prefix
+matches rank first, then by similarity; results are keyset-paginated by
+(score, user_id). Broad queries rank at most MAX_RANKED_MATCHES of the
+newest candidates, as resource search does.
+
+PostgreSQL evaluates both with pg_trgm under the GIN index declared with
+the User model. SQLite has no trigram index, so each process keeps one in
+memory (PeopleIndex): it is loaded on the first search, takes in the users
+this process adds, changes or deletes as their transactions commit, and is
+rebuilt in the background every USER_SEARCH_INDEX_TTL seconds to catch
+changes made by other processes. Users on the returned page are always
+read from the database.
+"""
+import asyncio
+import bisect
+import heapq
+import logging
+import math
+import re
+import time
+from array import array
+from collections import Counter, defaultdict, namedtuple
+from functools import lru_cache
+from typing import Optional
+
+from sqlalchemy import Float, Integer, case, column, event, func, literal, literal_column, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .core.config import settings
+from .database import PrimarySession, SessionLocal, engine
+from .models import User
+from .models.enums import UserRole
+from .pagination import CursorPage, decode_cursor
+
+# pg_trgm's default pg_trgm.word_similarity_threshold, used by the <% operator
+WORD_SIMILARITY_THRESHOLD = 0.6
+# Stale users reloaded one by one past this many are cheaper to pick up with a rebuild
+MAX_STALE_RELOAD = 1000
+
+Hit = namedtuple("Hit", "score user_id")
+Doc = namedtuple("Doc", "text role is_approved")
+EMPTY_POSTING = array("i")
+# Scoring reads every candidate while finding the newest is cheap on both backends
+MAX_RANKED_MATCHES = 1000
+KEYSET = (column("score", Float), column("user_id", Integer))
+INDEXED_COLUMNS = (User.user_id, User.first_name, User.last_name, User.email, User.role, User.is_approved)
+
+logger = logging.getLogger(__name__)
+
+def normalize(text: str) -> str:
+    return " ".join(text.lower().split())
+
+@lru_cache(maxsize=100000)
+def _word_trigrams(word: str) -> frozenset:
+    padded = f"  {word} "
+    return frozenset(padded[i:i + 3] for i in range(len(padded) - 2))
+
+def trigrams(text: str) -> set:
+    """Trigrams the way pg_trgm extracts them: per alphanumeric word, padded with two spaces in front and one behind."""
+    # Names repeat across users, so each word's trigrams are worked out once
+    return set().union(*map(_word_trigrams, re.findall(r"[^\W_]+", text.lower())))
+
+def _contains(posting, user_id: int) -> bool:
+    position = bisect.bisect_left(posting, user_id)
+    return position < len(posting) and posting[position] == user_id
+
+def _escape_like(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+def _search_text():
+    # Spelled exactly like SEARCH_TEXT_SQL in app/models/user.py so the trigram index applies
+    space = literal_column("' '")
+    return func.lower(space + User.first_name + space + User.last_name + space + User.email)
+
+def _document(first_name: str, last_name: str, email: str) -> str:
+    return f" {first_name} {last_name} {email}".lower()
+
+def _build(rows) -> tuple:
+    """Postings and documents for rows of INDEXED_COLUMNS in ID order."""
+    postings = defaultdict(list)
+    docs = {}
+    for user_id, first_name, last_name, email, role, is_approved in rows:
+        text = _document(first_name, last_name, email)
+        # Plain values only, so the garbage collector need not track 100k documents
+        docs[user_id] = Doc(text, role.value, is_approved)
+        for trigram in trigrams(text):
+            postings[trigram].append(user_id)
+    return {trigram: array("i", ids) for trigram, ids in postings.items()}, docs
+
+
+class PeopleIndex:
+    """In-process trigram index over users, for databases without pg_trgm."""
+
+    def __init__(self, ttl: int):
+        self.ttl = ttl
+        self._postings = {}
+        self._docs = {}
+        # Users whose text changed since they were indexed: the postings may
+        # still list trigrams they no longer have, so they are scored one by one
+        self._inexact = set()
+        self._max_id = 0
+        self._built_at = None
+        self._stale = set()
+        self._added = False
+        self._rebuilding = None
+        self._replay = set()
+        self._covered = set()
+        self._lock = asyncio.Lock()
+        self._build_lock = asyncio.Lock()
+
+    def mark_stale(self, user_ids):
+        self._stale.update(user_ids)
+
+    def mark_added(self):
+        self._added = True
+
+    def invalidate(self):
+        if self._built_at is not None:
+            self._built_at = float("-inf")
+
+    def _due(self) -> bool:
+        return time.monotonic() - self._built_at >= self.ttl or len(self._stale) > MAX_STALE_RELOAD
+
+    def _index(self, user_id: int, text: str, role: UserRole, is_approved: bool):
+        old = self._docs.get(user_id)
+        self._docs[user_id] = Doc(text, role.value, is_approved)
+        if old is not None and old.text == text:
+            return
+        known = trigrams(old.text) if old is not None else set()
+        for trigram in trigrams(text) - known:
+            posting = self._postings.setdefault(trigram, array("i"))
+            # Postings stay sorted by ID
+            if posting and posting[-1] > user_id:
+                bisect.insort(posting, user_id)
+            else:
+                posting.append(user_id)
+        if old is not None:
+            self._inexact.add(user_id)
+        self._max_id = max(self._max_id, user_id)
+
+    async def _load(self, db: AsyncSession, *criteria):
+        found = set()
+        for user_id, first_name, last_name, email, role, is_approved in (await db.execute(
+            select(*INDEXED_COLUMNS).where(*criteria).order_by(User.user_id)
+        )).all():
+            self._index(user_id, _document(first_name, last_name, email), role, is_approved)
+            found.add(user_id)
+        return found
+
+    async def _rebuild(self, db: AsyncSession):
+        # The rows about to be read include every change marked so far; the
+        # current index still takes them in, but they need no replaying
+        self._covered, self._stale = self._covered | self._stale, set()
+        rows = (await db.execute(select(*INDEXED_COLUMNS).order_by(User.user_id))).all()
+        # Building takes seconds for 100k users, keep the event loop serving meanwhile
+        postings, docs = await asyncio.to_thread(_build, rows)
+        async with self._lock:
+            self._postings, self._docs, self._inexact = postings, docs, set()
+            self._max_id = rows[-1].user_id if rows else 0
+            self._built_at = time.monotonic()
+            # Changes the old index took in while this one was built may postdate its rows
+            self._stale |= self._replay
+            self._added, self._replay, self._covered = True, set(), set()
+
+    async def _rebuild_in_background(self):
+        try:
+            async with SessionLocal() as db:
+                await self._rebuild(db)
+        except Exception:
+            logger.exception("Could not rebuild the user search index")
+            self._built_at = time.monotonic()
+        finally:
+            self._rebuilding = None
+
+    async def refresh(self, db: AsyncSession):
+        if self._built_at is None:
+            # Nothing to serve yet, so the first searches wait for the build
+            async with self._build_lock:
+                if self._built_at is None:
+                    await self._rebuild(db)
+        elif self._due() and self._rebuilding is None:
+            # Searches keep using the current index until the new one is in place
+            self._rebuilding = asyncio.create_task(self._rebuild_in_background())
+
+        async with self._lock:
+            if self._added:
+                # New users get higher IDs than any already loaded
+                self._added = False
+                await self._load(db, User.user_id > self._max_id)
+            if self._stale or self._covered:
+                if self._rebuilding is not None:
+                    self._replay |= self._stale
+                stale, self._stale, self._covered = self._stale | self._covered, set(), set()
+                for user_id in stale - await self._load(db, User.user_id.in_(list(stale))):
+                    self._docs.pop(user_id, None)
+                    self._inexact.discard(user_id)
+
+    def _posting(self, trigram: str):
+        return self._postings.get(trigram, EMPTY_POSTING)
+
+    def _walk(self, having: list, lacking, below: Optional[int]):
+        """IDs below `below`, highest first, in every posting of having and not in lacking.
+
+        The rarest posting is walked backwards and the others are probed by
+        bisection, so callers that stop once they have a page never touch
+        most of the matches.
+        """
+        if not having:
+            return
+        rarest, *others = sorted(having, key=len)
+        end = len(rarest) if below is None else bisect.bisect_left(rarest, below)
+        for position in range(end - 1, -1, -1):
+            user_id = rarest[position]
+            if user_id in self._inexact:
+                continue
+            for index, posting in enumerate(others):
+                if not _contains(posting, user_id):
+                    # Trigrams of one name come together; probe first whichever just ruled a user out
+                    others.insert(0, others.pop(index))
+                    break
+            else:
+                if lacking is None or not _contains(lacking, user_id):
+                    yield user_id
+
+    def search(self, text: str, role: Optional[UserRole], is_approved: Optional[bool],
+               after: Optional[list], limit: int) -> list:
+        """Up to limit best Hits ranking after the keyset position after."""
+        wanted = trigrams(text)
+        if not wanted:
+            return []
+        prefix = f" {text}"
+        after = Hit(*after) if after is not None else None
+
+        def eligible(doc) -> bool:
+            return (role is None or doc.role == role.value) and (is_approved is None or doc.is_approved == is_approved)
+
+        def score(is_prefix: bool, shared: int) -> float:
+            return is_prefix + shared / len(wanted)
+
+        hits = []
+        for user_id in self._inexact:
+            doc = self._docs.get(user_id)
+            if doc is None or not eligible(doc):
+                continue
+            shared, is_prefix = len(wanted & trigrams(doc.text)), prefix in doc.text
+            hit = Hit(score(is_prefix, shared), user_id)
+            if (is_prefix or shared / len(wanted) >= WORD_SIMILARITY_THRESHOLD) and (after is None or hit < after):
+                hits.append(hit)
+
+        # Prefix matches have every trigram of the query except the one closing
+        # its last word, which may still be being typed; those that also have
+        # that one rank first. Both tiers are walked best first and the walk
+        # stops once the page is full, however many users match.
+        last_word = re.findall(r"[^\W_]+", text)[-1]
+        closing = f" {last_word[-2:]} "[-3:] if text[-1].isalnum() else None
+        required = [self._posting(trigram) for trigram in wanted if trigram != closing]
+        tiers = [([self._posting(trigram) for trigram in wanted], None, score(True, len(wanted)))]
+        if closing is not None:
+            tiers.append((required, self._posting(closing), score(True, len(wanted) - 1)))
+        found = []
+        for having, lacking, tier in tiers:
+            if after is not None and tier > after.score:
+                continue
+            below = after.user_id if after is not None and tier == after.score else None
+            for user_id in self._walk(having, lacking, below):
+                doc = self._docs.get(user_id)
+                if doc is not None and eligible(doc) and prefix in doc.text:
+                    found.append(Hit(tier, user_id))
+                    if len(found) >= limit:
+                        return heapq.nlargest(limit, hits + found)
+
+        # Fuzzy matches rank below every prefix match. One shares at least
+        # `needed` trigrams with the query, so it is in at least one of the
+        # len(wanted) - needed + 1 rarest postings; the newest of those
+        # candidates are counted against the tails of all the postings.
+        needed = math.ceil(WORD_SIMILARITY_THRESHOLD * len(wanted) - 1e-9)
+        postings = sorted(map(self._posting, wanted), key=len)
+        newest = set().union(*(posting[-MAX_RANKED_MATCHES:] for posting in postings[:len(wanted) - needed + 1]))
+        if role is not None or is_approved is not None:
+            newest = {user_id for user_id in newest if user_id in self._docs and eligible(self._docs[user_id])}
+        candidates = set(sorted(newest - self._inexact)[-MAX_RANKED_MATCHES:])
+        if not candidates:
+            return heapq.nlargest(limit, hits + found)
+        oldest = min(candidates)
+        counts = Counter()
+        for posting in postings:
+            counts.update(candidates.intersection(posting[bisect.bisect_left(posting, oldest):]))
+        for user_id, shared in counts.items():
+            if shared < needed:
+                continue
+            doc = self._docs.get(user_id)
+            if doc is None or not eligible(doc) or prefix in doc.text:
+                continue
+            hit = Hit(score(False, shared), user_id)
+            if after is None or hit < after:
+                found.append(hit)
+        return heapq.nlargest(limit, hits + found)
+
+
+people_index = PeopleIndex(ttl=settings.user_search_index_ttl)
+
+async def _postgres_search(db: AsyncSession, page: CursorPage, text: str, criteria: list) -> list:
+    document = _search_text()
+    prefix = document.like(f"% {_escape_like(text)}%", escape="\\")
+    score = case((prefix, 1.0), else_=0.0) + func.word_similarity(text, document, type_=Float)
+    # Pick the candidates in a query of their own so only they are scored
+    candidates = select(User.user_id).where(or_(prefix, literal(text).op("<%")(document)), *criteria).order_by(
+        User.user_id.desc()
+    ).limit(MAX_RANKED_MATCHES).subquery("candidates")
+    ranked = select(User.user_id.label("user_id"), score.label("score")).join(
+        candidates, User.user_id == candidates.c.user_id
+    ).subquery("ranked")
+    order_by = (ranked.c.score, ranked.c.user_id)
+    page_rows = page.apply(select(*order_by), *order_by, descending=True, dialect="postgresql").subquery("page")
+    rows = (await db.execute(
+        select(User, page_rows.c.score, page_rows.c.user_id).join(page_rows, User.user_id == page_rows.c.user_id)
+        .order_by(page_rows.c.score.desc(), page_rows.c.user_id.desc())
+    )).all()
+    return [row.User for row in page.finish(rows, *order_by)]
+
+async def _indexed_search(db: AsyncSession, page: CursorPage, text: str, criteria: list,
+                          role: Optional[UserRole], is_approved: Optional[bool]) -> list:
+    await people_index.refresh(db)
+    after = decode_cursor(page.cursor, KEYSET) if page.cursor else None
+    hits = page.finish(people_index.search(text, role, is_approved, after, page.limit + 1), *KEYSET)
+    if not hits:
+        return []
+    # The index may trail changes made by other processes; the rows themselves are current
+    users = {user.user_id: user for user in (await db.scalars(
+        select(User).where(User.user_id.in_([hit.user_id for hit in hits]), *criteria)
+    )).all()}
+    return [users[hit.user_id] for hit in hits if hit.user_id in users]
+
+async def search_users(db: AsyncSession, page: CursorPage, text: str,
+                       role: Optional[UserRole] = None, is_approved: Optional[bool] = None) -> list:
+    """Users matching text, best match first."""
+    text = normalize(text)
+    if not text:
+        return []
+    criteria = []
+    if role is not None:
+        criteria.append(User.role == role)
+    if is_approved is not None:
+        criteria.append(User.is_approved == is_approved)
+    if db.get_bind().dialect.name == "postgresql":
+        return await _postgres_search(db, page, text, criteria)
+    return await _indexed_search(db, page, text, criteria, role, is_approved)
+
+def _track_flush(session, flush_context):
+    # New users are loaded by ID, changed and deleted ones are reloaded one by one
+    if any(isinstance(obj, User) for obj in session.new):
+        session.info["users_added"] = True
+    changed = {obj.user_id for obj in (*session.dirty, *session.deleted) if isinstance(obj, User)}
+    if changed:
+        session.info.setdefault("changed_users", set()).update(changed)
+
+def _track_statement(orm_execute_state):
+    if not (orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete):
+        return
+    mapper = orm_execute_state.bind_mapper
+    if mapper is None or mapper.class_ is not User:
+        return
+    if orm_execute_state.is_insert:
+        orm_execute_state.session.info["users_added"] = True
+        return
+    changed = orm_execute_state.session.info.setdefault("changed_users", set())
+    whereclause = orm_execute_state.statement.whereclause
+    if whereclause is None:
+        # Every user may have changed; None asks for a rebuild
+        changed.add(None)
+        return
+    # Read the IDs before the statement runs, it may change the columns it filters on
+    connection = orm_execute_state.session.connection()
+    changed.update(connection.execute(select(User.user_id).where(whereclause)).scalars().all())
+
+def _apply_changes(session):
+    if session.info.pop("users_added", False):
+        people_index.mark_added()
+    changed = session.info.pop("changed_users", None)
+    if not changed:
+        return
+    if None in changed:
+        people_index.invalidate()
+    else:
+        people_index.mark_stale(changed)
+
+def _discard_changes(session):
+    session.info.pop("users_added", None)
+    session.info.pop("changed_users", None)
+
+if engine.dialect.name != "postgresql":
+    event.listen(PrimarySession, "after_flush", _track_flush)
+    event.listen(PrimarySession, "do_orm_execute", _track_statement)
+    event.listen(PrimarySession, "after_commit", _apply_changes)
+    event.listen(PrimarySession, "after_rollback", _discard_changes)
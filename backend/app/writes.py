@@ -0,0 +1,68 @@
+"""Single-statement writes built on INSERT/UPDATE ... RETURNING.
+
+Creates and updates get the row back from the write itself instead of a
+follow-up SELECT. Preconditions that used to cost a query of their own are
+folded into the statement: a guard turns the INSERT into
+INSERT ... SELECT ... WHERE EXISTS (...), and duplicates are caught by the
+table's unique constraint with ON CONFLICT DO NOTHING, which also closes
+the race between checking and inserting. When the statement returns no
+row the caller decides which error to report, and only that path spends
+another query.
+"""
+from sqlalchemy import cast, exists, inspect, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+# ON CONFLICT is dialect-specific, so pick the insert() that supports it
+INSERTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+def dialect_insert(db: AsyncSession, model):
+    return INSERTS[db.get_bind().dialect.name](model)
+
+async def insert_returning(
+    db: AsyncSession, model, values: dict, guard: tuple = (), conflict: tuple = (), update: dict = None
+):
+    """Insert one row and return it as an ORM object.
+
+    guard: criteria that must match a row (e.g. the parent exists) for the insert to happen.
+    conflict: unique columns; an existing row with the same values is left alone,
+    or, when update is given, has those values set and is returned instead.
+    Returns None when the guard matched nothing or the row already existed.
+    """
+    statement = dialect_insert(db, model)
+    if guard:
+        # Typed casts, since a bare SELECT of bind parameters gives the database nothing to infer types from
+        table = model.__table__
+        row = select(*[cast(value, table.c[key].type) for key, value in values.items()])
+        statement = statement.from_select(list(values), row.where(exists().where(*guard)))
+    else:
+        statement = statement.values(**values)
+    if conflict and update:
+        statement = statement.on_conflict_do_update(index_elements=list(conflict), set_=update)
+    elif conflict:
+        statement = statement.on_conflict_do_nothing(index_elements=list(conflict))
+    return await db.scalar(statement.returning(model))
+
+async def insert_many_returning(db: AsyncSession, model, rows: list, conflict: tuple = (), batch_size: int = 1000) -> list:
+    """Insert rows with one multi-row INSERT ... RETURNING per batch and return them as ORM objects.
+
+    conflict: unique columns; rows that clash with an existing row are
+    skipped and missing from the result, which is not in input order.
+    """
+    statement = dialect_insert(db, model)
+    if conflict:
+        statement = statement.on_conflict_do_nothing(index_elements=list(conflict))
+    statement = statement.returning(model)
+    inserted = []
+    for start in range(0, len(rows), batch_size):
+        result = await db.execute(statement, rows[start:start + batch_size])
+        inserted.extend(result.scalars().all())
+    return inserted
+
+async def update_returning(db: AsyncSession, model, object_id, values: dict, *criteria):
+    """Update one row by primary key and return it, or None when no row matched criteria."""
+    primary_key = inspect(model).primary_key[0]
+    if not values:
+        return await db.scalar(select(model).where(primary_key == object_id, *criteria))
+    statement = update(model).where(primary_key == object_id, *criteria).values(**values).returning(model)
+    return await db.scalar(statement)
@@ -0,0 +1,63 @@
+"""Add indexes for the filters used by the API routes
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18
+
+Tables are created by the application on startup, so this revision only
+adds the indexes that existing databases are missing. On PostgreSQL they
+are built CONCURRENTLY so the hot tables stay writable during the upgrade.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+# (name, table, columns, partial index predicate)
+INDEXES = [
+    ("ix_messages_sender_receiver_sent_at", "messages", ["sender_id", "receiver_id", "sent_at"], None),
+    ("ix_messages_receiver_sent_at", "messages", ["receiver_id", "sent_at"], None),
+    ("ix_messages_unread", "messages", ["receiver_id", "sender_id"], "is_read = false"),
+    ("ix_mentormatches_mentor_status", "mentormatches", ["mentor_id", "status"], None),
+    ("ix_mentormatches_member_status", "mentormatches", ["member_id", "status"], None),
+    ("ix_mentormatches_pending", "mentormatches", ["mentor_id"], "status = 'pending'"),
+    ("ix_ventures_member_id", "ventures", ["member_id"], None),
+    ("ix_applications_venture_id", "applications", ["venture_id"], None),
+    ("ix_applications_status", "applications", ["status"], None),
+    ("ix_milestones_venture_id", "milestones", ["venture_id"], None),
+    ("ix_resources_category_created_at", "resources", ["category_id", "created_at"], None),
+    ("ix_resources_uploaded_by_id", "resources", ["uploaded_by_id"], None),
+    ("ix_users_role_is_approved", "users", ["role", "is_approved"], None),
+    ("ix_users_pending_approval", "users", ["created_at"], "is_approved = false"),
+]
+
+
+def _predicate(where):
+    if where is None:
+        return {}
+    if op.get_context().dialect.name == "sqlite":
+        # SQLite stores booleans as integers
+        where = where.replace("= false", "= 0")
+    return {"postgresql_where": sa.text(where), "sqlite_where": sa.text(where)}
+
+
+def upgrade():
+    with op.get_context().autocommit_block():
+        for name, table, columns, where in INDEXES:
+            op.create_index(
+                name, table, columns,
+                if_not_exists=True,
+                postgresql_concurrently=True,
+                **_predicate(where),
+            )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for name, table, _, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, if_exists=True, postgresql_concurrently=True)
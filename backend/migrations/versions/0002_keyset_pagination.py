@@ -0,0 +1,30 @@
+"""Index the unfiltered resource listing for keyset pagination
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18
+
+GET /resources/ pages through (created_at, resource_id) when no category
+is given; without this index every page sorts the whole table.
+"""
+from alembic import op
+
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_resources_created_at", "resources", ["created_at", "resource_id"],
+            if_not_exists=True,
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index("ix_resources_created_at", table_name="resources", if_exists=True, postgresql_concurrently=True)
@@ -0,0 +1,67 @@
+"""Allow one application per venture at the database level
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18
+
+create_application now inserts with ON CONFLICT (venture_id) DO NOTHING
+instead of checking for an existing application first, which needs a
+unique index to arbitrate. It replaces the plain ix_applications_venture_id
+index. The upgrade stops before building anything if a venture already
+has more than one application and lists them; keep one application per
+venture and rerun it. On PostgreSQL an INVALID uq_applications_venture_id
+left by an interrupted concurrent build is dropped and rebuilt, since an
+invalid index cannot arbitrate ON CONFLICT.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+
+def _duplicate_ventures(bind) -> list:
+    return bind.execute(sa.text(
+        "SELECT venture_id FROM applications GROUP BY venture_id HAVING count(*) > 1 ORDER BY venture_id"
+    )).scalars().all()
+
+
+def _has_invalid_index(bind, name: str) -> bool:
+    return bool(bind.execute(sa.text(
+        "SELECT EXISTS (SELECT 1 FROM pg_index WHERE indexrelid = to_regclass(:name) AND NOT indisvalid)"
+    ), {"name": name}).scalar())
+
+
+def upgrade():
+    bind = op.get_bind()
+    duplicates = _duplicate_ventures(bind)
+    if duplicates:
+        shown = ", ".join(str(venture_id) for venture_id in duplicates[:20])
+        more = f" and {len(duplicates) - 20} more" if len(duplicates) > 20 else ""
+        raise RuntimeError(
+            f"{len(duplicates)} ventures have more than one application (venture_id {shown}{more}); "
+            "keep one application per venture and rerun the upgrade"
+        )
+    with op.get_context().autocommit_block():
+        if bind.dialect.name == "postgresql" and _has_invalid_index(bind, "uq_applications_venture_id"):
+            op.drop_index("uq_applications_venture_id", table_name="applications", postgresql_concurrently=True)
+        op.create_index(
+            "uq_applications_venture_id", "applications", ["venture_id"],
+            unique=True,
+            if_not_exists=True,
+            postgresql_concurrently=True,
+        )
+        op.drop_index("ix_applications_venture_id", table_name="applications", if_exists=True, postgresql_concurrently=True)
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_applications_venture_id", "applications", ["venture_id"],
+            if_not_exists=True,
+            postgresql_concurrently=True,
+        )
+        op.drop_index("uq_applications_venture_id", table_name="applications", if_exists=True, postgresql_concurrently=True)
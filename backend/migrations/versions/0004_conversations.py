@@ -0,0 +1,105 @@
+"""Normalize messages into conversations
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18
+
+Messages between two users now belong to a conversations row keyed on the
+ordered participant pair, and GET /messages/conversation/{id} reads one
+range of ix_messages_conversation_sent_at instead of OR-ing two
+sender/receiver lookups. Existing messages are backfilled in batches of
+message IDs, each committed on its own, so the messages table is never
+locked for the whole run; rerunning the upgrade resumes where it stopped.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+
+BATCH_SIZE = 10000
+LOW = "CASE WHEN sender_id < receiver_id THEN sender_id ELSE receiver_id END"
+HIGH = "CASE WHEN sender_id < receiver_id THEN receiver_id ELSE sender_id END"
+
+
+def upgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    # The application creates the table on startup, so it may already exist
+    if not inspector.has_table("conversations"):
+        op.create_table(
+            "conversations",
+            sa.Column("conversation_id", sa.Integer, primary_key=True),
+            sa.Column("user_low_id", sa.Integer, sa.ForeignKey("users.user_id", ondelete="CASCADE"), nullable=False),
+            sa.Column("user_high_id", sa.Integer, sa.ForeignKey("users.user_id", ondelete="CASCADE"), nullable=False),
+            sa.Column("created_at", sa.TIMESTAMP, server_default=sa.func.now()),
+            sa.Column("last_message_at", sa.TIMESTAMP, server_default=sa.func.now()),
+            sa.CheckConstraint("user_low_id < user_high_id", name="check_conversation_participants_ordered"),
+            sa.UniqueConstraint("user_low_id", "user_high_id", name="uq_conversations_participants"),
+        )
+    if "conversation_id" not in {column["name"] for column in inspector.get_columns("messages")}:
+        # Batch mode so SQLite, which cannot add a foreign key in place, rebuilds the table
+        with op.batch_alter_table("messages") as batch:
+            batch.add_column(sa.Column(
+                "conversation_id", sa.Integer,
+                sa.ForeignKey("conversations.conversation_id", name="fk_messages_conversation_id", ondelete="CASCADE"),
+                nullable=True,
+            ))
+
+    with op.get_context().autocommit_block():
+        for name, columns in (
+            ("ix_conversations_low_last_message_at", ["user_low_id", "last_message_at"]),
+            ("ix_conversations_high_last_message_at", ["user_high_id", "last_message_at"]),
+        ):
+            op.create_index(name, "conversations", columns, if_not_exists=True, postgresql_concurrently=True)
+
+        first, last = bind.execute(sa.text(
+            "SELECT min(message_id), max(message_id) FROM messages WHERE conversation_id IS NULL"
+        )).one()
+        if first is not None:
+            for start in range(first, last + 1, BATCH_SIZE):
+                batch = {"start": start, "end": start + BATCH_SIZE}
+                bind.execute(sa.text(
+                    f"INSERT INTO conversations (user_low_id, user_high_id, created_at, last_message_at) "
+                    f"SELECT {LOW}, {HIGH}, min(sent_at), max(sent_at) FROM messages "
+                    f"WHERE message_id >= :start AND message_id < :end AND conversation_id IS NULL "
+                    f"GROUP BY {LOW}, {HIGH} "
+                    f"ON CONFLICT (user_low_id, user_high_id) DO NOTHING"
+                ), batch)
+                bind.execute(sa.text(
+                    f"UPDATE messages SET conversation_id = ("
+                    f"SELECT conversation_id FROM conversations "
+                    f"WHERE user_low_id = {LOW} AND user_high_id = {HIGH}) "
+                    f"WHERE message_id >= :start AND message_id < :end AND conversation_id IS NULL"
+                ), batch)
+
+        op.create_index(
+            "ix_messages_conversation_sent_at", "messages", ["conversation_id", "sent_at", "message_id"],
+            if_not_exists=True,
+            postgresql_concurrently=True,
+        )
+
+    # Conversations first seen in one batch may continue in later ones; settle their
+    # activity timestamps from the new index now that every message is assigned
+    bind.execute(sa.text(
+        "UPDATE conversations SET "
+        "created_at = (SELECT min(sent_at) FROM messages WHERE messages.conversation_id = conversations.conversation_id), "
+        "last_message_at = (SELECT max(sent_at) FROM messages WHERE messages.conversation_id = conversations.conversation_id) "
+        "WHERE EXISTS (SELECT 1 FROM messages WHERE messages.conversation_id = conversations.conversation_id)"
+    ))
+    if bind.dialect.name != "sqlite":
+        # SQLite cannot tighten a column in place; the application always sets it
+        op.alter_column("messages", "conversation_id", nullable=False)
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index("ix_messages_conversation_sent_at", table_name="messages", if_exists=True, postgresql_concurrently=True)
+    # SQLite refuses to drop a column that carries a foreign key, so rebuild the table there
+    with op.batch_alter_table("messages") as batch:
+        batch.drop_column("conversation_id")
+    op.drop_table("conversations")
@@ -0,0 +1,193 @@
+"""Partition messages by month and add the message archive
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18
+
+On PostgreSQL messages becomes a table range-partitioned on sent_at with
+one partition per month and a default partition for anything outside
+them; the primary key grows to (message_id, sent_at) because a
+partitioned table's keys must contain the partition column. Rows are
+copied into the new table in committed batches while the old one stays
+live, then writes are blocked (reads are not) for the final catch-up:
+messages sent, read or deleted during the copy are applied and the tables
+swapped. SQLite has no partitioning and keeps the single table.
+
+message_archive receives read messages past MESSAGE_RETENTION_DAYS, see
+app/retention.py and scripts/archive_messages.py. Downgrading moves them
+back into messages.
+"""
+import zlib
+from datetime import date
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+
+BATCH_SIZE = 50000
+MONTHS_AHEAD = 3
+COLUMNS = "message_id, sender_id, receiver_id, conversation_id, content, sent_at, is_read"
+FOREIGN_KEYS = [
+    ("fk_messages_sender_id", "sender_id", "users (user_id)"),
+    ("fk_messages_receiver_id", "receiver_id", "users (user_id)"),
+    ("fk_messages_conversation_id", "conversation_id", "conversations (conversation_id)"),
+]
+# (name, columns, partial index predicate), as declared on the Message model
+INDEXES = [
+    ("ix_messages_sender_receiver_sent_at", "sender_id, receiver_id, sent_at", None),
+    ("ix_messages_receiver_sent_at", "receiver_id, sent_at", None),
+    ("ix_messages_unread", "receiver_id, sender_id", "is_read = false"),
+    ("ix_messages_conversation_sent_at", "conversation_id, sent_at, message_id", None),
+]
+
+
+def _add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _is_partitioned(bind) -> bool:
+    return bool(bind.execute(sa.text(
+        "SELECT EXISTS (SELECT 1 FROM pg_partitioned_table pt "
+        "JOIN pg_class c ON c.oid = pt.partrelid WHERE c.relname = 'messages')"
+    )).scalar())
+
+
+def _copy_table(bind, target: str, primary_key: str, partitioned: bool):
+    """Empty copy of messages named target, with its own keys but no indexes yet."""
+    clause = " PARTITION BY RANGE (sent_at)" if partitioned else ""
+    bind.execute(sa.text(f"CREATE TABLE {target} (LIKE messages INCLUDING DEFAULTS INCLUDING CONSTRAINTS){clause}"))
+    bind.execute(sa.text(f"ALTER TABLE {target} ALTER COLUMN sent_at SET NOT NULL"))
+    bind.execute(sa.text(f"ALTER TABLE {target} ADD CONSTRAINT {target}_pkey PRIMARY KEY ({primary_key})"))
+    for name, column, reference in FOREIGN_KEYS:
+        bind.execute(sa.text(
+            f"ALTER TABLE {target} ADD CONSTRAINT {name}_{target} "
+            f"FOREIGN KEY ({column}) REFERENCES {reference} ON DELETE CASCADE"
+        ))
+
+
+def _swap(bind, target: str, sequence: str):
+    """Replace messages with target and give its keys and indexes the usual names."""
+    bind.execute(sa.text("ALTER TABLE messages RENAME TO messages_replaced"))
+    bind.execute(sa.text(f"ALTER TABLE {target} RENAME TO messages"))
+    # Move the ID sequence over first, dropping the old table would drop it too
+    bind.execute(sa.text(f"ALTER SEQUENCE {sequence} OWNED BY messages.message_id"))
+    bind.execute(sa.text("DROP TABLE messages_replaced"))
+    bind.execute(sa.text(f"ALTER TABLE messages RENAME CONSTRAINT {target}_pkey TO messages_pkey"))
+    for name, _, _ in FOREIGN_KEYS:
+        bind.execute(sa.text(f"ALTER TABLE messages RENAME CONSTRAINT {name}_{target} TO {name}"))
+    for name, _, _ in INDEXES:
+        bind.execute(sa.text(f"ALTER INDEX {name}_{target} RENAME TO {name}"))
+
+
+def _create_indexes(bind, target: str):
+    for name, columns, where in INDEXES:
+        predicate = f" WHERE {where}" if where else ""
+        bind.execute(sa.text(f"CREATE INDEX {name}_{target} ON {target} ({columns}){predicate}"))
+
+
+def _partition_messages(bind):
+    sequence = bind.execute(sa.text("SELECT pg_get_serial_sequence('messages', 'message_id')")).scalar()
+    first_sent, last_id = bind.execute(sa.text("SELECT min(sent_at), max(message_id) FROM messages")).one()
+
+    _copy_table(bind, "messages_partitioned", "message_id, sent_at", partitioned=True)
+    this_month = date.today().replace(day=1)
+    month = (first_sent.date() if first_sent else this_month).replace(day=1)
+    while month <= _add_months(this_month, MONTHS_AHEAD):
+        bind.execute(sa.text(
+            f"CREATE TABLE messages_p{month:%Y_%m} PARTITION OF messages_partitioned "
+            f"FOR VALUES FROM ('{month.isoformat()}') TO ('{_add_months(month, 1).isoformat()}')"
+        ))
+        month = _add_months(month, 1)
+    bind.execute(sa.text("CREATE TABLE messages_default PARTITION OF messages_partitioned DEFAULT"))
+
+    with op.get_context().autocommit_block():
+        # Bulk copy while messages stays writable; indexes are built afterwards in one pass
+        for start in range(0, (last_id or 0) + 1, BATCH_SIZE):
+            bind.execute(sa.text(
+                f"INSERT INTO messages_partitioned ({COLUMNS}) "
+                f"SELECT {COLUMNS.replace('sent_at', 'COALESCE(sent_at, now())')} FROM messages "
+                f"WHERE message_id >= :start AND message_id < :end"
+            ), {"start": start, "end": start + BATCH_SIZE})
+        _create_indexes(bind, "messages_partitioned")
+
+    # Catch up under a lock that blocks writes but not reads, then swap
+    bind.execute(sa.text("LOCK TABLE messages IN EXCLUSIVE MODE"))
+    # Transactions can commit out of ID order, so look for every missing row, not just newer IDs
+    bind.execute(sa.text(
+        f"INSERT INTO messages_partitioned ({COLUMNS}) "
+        f"SELECT {COLUMNS.replace('sent_at', 'COALESCE(sent_at, now())')} FROM messages m "
+        f"WHERE NOT EXISTS (SELECT 1 FROM messages_partitioned p WHERE p.message_id = m.message_id)"
+    ))
+    bind.execute(sa.text(
+        "UPDATE messages_partitioned p SET is_read = m.is_read FROM messages m "
+        "WHERE m.message_id = p.message_id AND m.is_read IS DISTINCT FROM p.is_read"
+    ))
+    bind.execute(sa.text(
+        "DELETE FROM messages_partitioned p WHERE NOT EXISTS "
+        "(SELECT 1 FROM messages m WHERE m.message_id = p.message_id)"
+    ))
+    _swap(bind, "messages_partitioned", sequence)
+
+
+def _unpartition_messages(bind):
+    sequence = bind.execute(sa.text("SELECT pg_get_serial_sequence('messages', 'message_id')")).scalar()
+    bind.execute(sa.text("LOCK TABLE messages IN EXCLUSIVE MODE"))
+    _copy_table(bind, "messages_plain", "message_id", partitioned=False)
+    bind.execute(sa.text(f"INSERT INTO messages_plain ({COLUMNS}) SELECT {COLUMNS} FROM messages"))
+    _create_indexes(bind, "messages_plain")
+    _swap(bind, "messages_plain", sequence)
+
+
+def upgrade():
+    bind = op.get_bind()
+    # The application creates the table on startup, so it may already exist
+    if not sa.inspect(bind).has_table("message_archive"):
+        op.create_table(
+            "message_archive",
+            sa.Column("message_id", sa.Integer, primary_key=True, autoincrement=False),
+            sa.Column("conversation_id", sa.Integer, sa.ForeignKey("conversations.conversation_id", ondelete="CASCADE"), nullable=False),
+            sa.Column("sender_id", sa.Integer, sa.ForeignKey("users.user_id", ondelete="CASCADE"), nullable=False),
+            sa.Column("receiver_id", sa.Integer, sa.ForeignKey("users.user_id", ondelete="CASCADE"), nullable=False),
+            sa.Column("content", sa.LargeBinary, nullable=False),
+            sa.Column("sent_at", sa.TIMESTAMP, nullable=False),
+            sa.Column("archived_at", sa.TIMESTAMP, server_default=sa.func.now()),
+        )
+        op.create_index("ix_message_archive_conversation_sent_at", "message_archive", ["conversation_id", "sent_at"])
+
+    if bind.dialect.name == "postgresql" and not _is_partitioned(bind):
+        _partition_messages(bind)
+
+
+def downgrade():
+    bind = op.get_bind()
+    if bind.dialect.name == "postgresql" and _is_partitioned(bind):
+        _unpartition_messages(bind)
+
+    # Put archived messages back before the archive goes away
+    archive = sa.table(
+        "message_archive", *(sa.column(name) for name in
+                             ("message_id", "conversation_id", "sender_id", "receiver_id", "content", "sent_at"))
+    )
+    messages = sa.table(
+        "messages", *(sa.column(name) for name in
+                      ("message_id", "conversation_id", "sender_id", "receiver_id", "content", "sent_at", "is_read"))
+    )
+    after = 0
+    while True:
+        rows = bind.execute(
+            sa.select(archive).where(archive.c.message_id > after).order_by(archive.c.message_id).limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        bind.execute(sa.insert(messages), [
+            {**row._asdict(), "content": zlib.decompress(row.content).decode(), "is_read": True} for row in rows
+        ])
+        after = rows[-1].message_id
+    op.drop_table("message_archive")
@@ -0,0 +1,72 @@
+"""Full-text search index over resources
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18
+
+Backs GET /resources/search. On PostgreSQL a stored generated tsvector
+column (title weighted above description) is added and indexed with GIN;
+adding it rewrites resources once, under a lock that blocks reads and
+writes, while the GIN index is built CONCURRENTLY afterwards. On SQLite
+an external-content FTS5 table is created, kept in step by triggers and
+filled from the existing rows.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+
+SQLITE = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS resources_fts USING fts5("
+    "title, description, content='resources', content_rowid='resource_id', tokenize='porter unicode61')",
+    "CREATE TRIGGER IF NOT EXISTS resources_fts_insert AFTER INSERT ON resources BEGIN "
+    "INSERT INTO resources_fts(rowid, title, description) VALUES (new.resource_id, new.title, new.description); END",
+    "CREATE TRIGGER IF NOT EXISTS resources_fts_delete AFTER DELETE ON resources BEGIN "
+    "INSERT INTO resources_fts(resources_fts, rowid, title, description) "
+    "VALUES ('delete', old.resource_id, old.title, old.description); END",
+    "CREATE TRIGGER IF NOT EXISTS resources_fts_update AFTER UPDATE OF title, description ON resources BEGIN "
+    "INSERT INTO resources_fts(resources_fts, rowid, title, description) "
+    "VALUES ('delete', old.resource_id, old.title, old.description); "
+    "INSERT INTO resources_fts(rowid, title, description) VALUES (new.resource_id, new.title, new.description); END",
+    # Reindex every existing row from the content table
+    "INSERT INTO resources_fts(resources_fts) VALUES ('rebuild')",
+]
+
+
+def upgrade():
+    bind = op.get_bind()
+    if bind.dialect.name == "sqlite":
+        for statement in SQLITE:
+            bind.execute(sa.text(statement))
+        return
+
+    op.execute(
+        "ALTER TABLE resources ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS ("
+        "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+        "setweight(to_tsvector('english', coalesce(description, '')), 'B')) STORED"
+    )
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_resources_search_vector", "resources", ["search_vector"],
+            if_not_exists=True,
+            postgresql_using="gin",
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade():
+    bind = op.get_bind()
+    if bind.dialect.name == "sqlite":
+        for name in ("resources_fts_insert", "resources_fts_delete", "resources_fts_update"):
+            bind.execute(sa.text(f"DROP TRIGGER IF EXISTS {name}"))
+        bind.execute(sa.text("DROP TABLE IF EXISTS resources_fts"))
+        return
+
+    with op.get_context().autocommit_block():
+        op.drop_index("ix_resources_search_vector", table_name="resources", if_exists=True, postgresql_concurrently=True)
+    op.execute("ALTER TABLE resources DROP COLUMN IF EXISTS search_vector")
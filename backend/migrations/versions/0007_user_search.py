@@ -0,0 +1,42 @@
+"""Trigram index for user search
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-18
+
+Backs GET /users/search on PostgreSQL: enables pg_trgm (the migrating role
+needs the privilege to create extensions) and builds a GIN trigram index
+CONCURRENTLY over the lower-cased " first last email" expression that
+app/user_search.py matches against. SQLite keeps its search index in the
+application process, so there is nothing to do there.
+"""
+from alembic import op
+
+
+revision = "0007"
+down_revision = "0006"
+branch_labels = None
+depends_on = None
+
+
+# As SEARCH_TEXT_SQL in app/models/user.py
+SEARCH_TEXT_SQL = "lower(' ' || first_name || ' ' || last_name || ' ' || email)"
+
+
+def upgrade():
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    with op.get_context().autocommit_block():
+        op.execute(
+            f"CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_users_search_trgm "
+            f"ON users USING GIN ({SEARCH_TEXT_SQL} gin_trgm_ops)"
+        )
+
+
+def downgrade():
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    # pg_trgm stays installed, other objects may have come to depend on it
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_users_search_trgm")
@@ -0,0 +1,39 @@
+"""Run one message retention pass.
+
+Creates the upcoming monthly messages partitions (PostgreSQL), moves read
+messages older than the retention period into message_archive in batches
+and drops partitions that are left empty. Safe to run from several hosts
+at once; meant to be scheduled daily, e.g. from cron.
+
+Usage (from the backend directory, with the usual .env in place):
+    python -m scripts.archive_messages
+    python -m scripts.archive_messages --days 180 --batch-size 5000
+"""
+import argparse
+import asyncio
+import json
+
+from app.core.config import settings
+from app.database import SessionLocal, engine
+from app.retention import run_retention
+
+
+async def run(days: int, batch_size: int):
+    async with SessionLocal() as db:
+        summary = await run_retention(db, retention_days=days, batch_size=batch_size)
+    await engine.dispose()
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--days", type=int, default=settings.message_retention_days,
+                        help="archive read messages older than this many days, 0 only maintains partitions")
+    parser.add_argument("--batch-size", type=int, default=settings.message_archive_batch_size)
+    args = parser.parse_args()
+
+    print(json.dumps(asyncio.run(run(args.days, args.batch_size))))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""Serialization cost per 1,000 rows for the dashboard and admin list responses.
+
+Builds ORM objects in memory (no database) and times turning them into
+JSON bytes three ways:
+
+  jsonable_encoder  what FastAPI did for routes without a response_model:
+                    reflective encoding, then json.dumps (JSONResponse)
+  response_model    FastAPI's response_model path: validate, dump to
+                    Python primitives, then orjson (ORJSONResponse)
+  TypeAdapter       app.serialization.typed_response: validate with an
+                    adapter built once and write JSON in pydantic-core
+
+Usage (from the backend directory, with the usual .env in place):
+    python -m scripts.bench_serialization
+    python -m scripts.bench_serialization --rows 5000 --repeat 50
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from datetime import datetime, timedelta
+from typing import List
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import ORJSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+
+from app.models import Application, MentorMatch, User
+from app.models.enums import ApplicationStatus, MatchStatus, UserRole
+from app.routes.admin import APPLICATION_LIST
+from app.routes.dashboard import MENTOR_DASHBOARD
+from app.schemas import ApplicationResponse, MentorDashboardResponse, UserResponse
+from app.serialization import list_adapter, typed_response
+
+def users(count: int) -> list:
+    start = datetime(2024, 1, 1)
+    return [
+        User(user_id=i, first_name=f"First{i}", last_name=f"Last{i}", email=f"user{i}@example.com",
+             password_hash="x" * 60, role=UserRole.MEMBER, is_approved=i % 10 != 0,
+             profile_details="Founder of a diagnostics startup" if i % 3 else None,
+             created_at=start + timedelta(minutes=i))
+        for i in range(1, count + 1)
+    ]
+
+def applications(count: int) -> list:
+    start = datetime(2024, 1, 1)
+    return [
+        Application(application_id=i, venture_id=i, program_id=i % 7 + 1,
+                    status=ApplicationStatus.APPROVED if i % 2 else ApplicationStatus.SUBMITTED,
+                    submission_date=start + timedelta(minutes=i), reviewed_by=1 if i % 2 else None,
+                    reviewed_at=start + timedelta(days=1, minutes=i) if i % 2 else None)
+        for i in range(1, count + 1)
+    ]
+
+def mentor_dashboard(count: int) -> dict:
+    mentees = users(count)
+    matches = [
+        MentorMatch(match_id=i, mentor_id=0, member_id=user.user_id, status=MatchStatus.PENDING, created_at=user.created_at)
+        for i, user in enumerate(mentees[:20], 1)
+    ]
+    mentor = User(user_id=0, first_name="Mentor", last_name="One", email="mentor@example.com", password_hash="x",
+                  role=UserRole.MENTOR, is_approved=True, profile_details=None, created_at=datetime(2024, 1, 1))
+    return {
+        "user": mentor, "mentor_matches": matches, "pending_requests": matches, "shared_resources": [],
+        "potential_mentees": mentees,
+        "stats": {"total_mentees": 0, "pending_requests": len(matches), "resources_shared": 0},
+    }
+
+# (name, response_model, adapter, rows per payload -> payload)
+CASES = [
+    ("GET /admin/users", List[UserResponse], list_adapter(UserResponse), users),
+    ("GET /admin/applications", List[ApplicationResponse], APPLICATION_LIST, applications),
+    ("GET /dashboard/mentor", MentorDashboardResponse, MENTOR_DASHBOARD, mentor_dashboard),
+]
+
+def time_per_call(function, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1000, help="rows per response")
+    parser.add_argument("--repeat", type=int, default=20, help="timed runs per method; the median is reported")
+    args = parser.parse_args()
+
+    scale = 1000 / args.rows
+    print(f"median ms per 1,000 rows ({args.rows} rows per response, {args.repeat} runs)")
+    print(f"{'response':<26}{'jsonable_encoder':>18}{'response_model':>16}{'TypeAdapter':>13}{'speedup':>9}")
+    for name, response_model, adapter, make_payload in CASES:
+        payload = make_payload(args.rows)
+        field = create_response_field(name="Response_" + name, type_=response_model)
+        # Both encodings must agree on the schema's fields before timing means anything
+        reference = ORJSONResponse(asyncio.run(serialize_response(field=field, response_content=payload))).body
+        assert json.loads(typed_response(adapter, payload).body) == json.loads(reference)
+
+        reflective = time_per_call(lambda: json.dumps(jsonable_encoder(payload)).encode(), args.repeat)
+        through_model = time_per_call(
+            lambda: ORJSONResponse(asyncio.run(serialize_response(field=field, response_content=payload))).body, args.repeat
+        )
+        typed = time_per_call(lambda: typed_response(adapter, payload).body, args.repeat)
+        print(
+            f"{name:<26}{reflective * scale * 1000:>18.2f}{through_model * scale * 1000:>16.2f}"
+            f"{typed * scale * 1000:>13.2f}{reflective / typed:>8.1f}x"
+        )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""Synthetic data generator shared by the benchmark and plan-check scripts.
+
+Rows are inserted with batched executemany through a sync engine, so the
+database URL must use a sync driver (postgresql:// or sqlite:///).
+"""
+import random
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, insert, select
+from sqlalchemy.engine import Engine
+
+from app.database import Base
+from app.models import (
+    Application, Conversation, MentorMatch, Message, Milestone, Program, Resource, ResourceCategory, User, Venture,
+)
+from app.models.conversations import participants
+from app.models.enums import ApplicationStatus, MatchStatus, MilestoneStatus, UserRole
+
+BATCH_SIZE = 5000
+WORDS = (
+    "health clinic telemedicine funding grant investor pitch supply chain pharmacy diagnostics "
+    "maternal rural mobile insurance regulation market growth mentor startup africa nurse "
+    "hospital data platform device vaccine nutrition finance scale impact community"
+).split()
+
+
+def _sentence(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words)).capitalize()
+
+
+def _insert(conn, model, rows):
+    for start in range(0, len(rows), BATCH_SIZE):
+        conn.execute(insert(model), rows[start:start + BATCH_SIZE])
+
+
+def seed(engine: Engine, users: int = 20000, messages: int = 200000, resources: int = 50000, seed: int = 42):
+    """Create tables and fill them with a deterministic dataset unless it is already populated."""
+    rng = random.Random(seed)
+    Base.metadata.create_all(engine)
+    epoch = datetime(2024, 1, 1)
+
+    with engine.begin() as conn:
+        if conn.scalar(select(func.count()).select_from(User)) >= users:
+            return
+
+        user_rows = []
+        for i in range(users):
+            role = UserRole.ADMIN if i < 5 else (UserRole.MENTOR if rng.random() < 0.1 else UserRole.MEMBER)
+            user_rows.append({
+                "first_name": rng.choice(WORDS).capitalize(),
+                "last_name": f"{rng.choice(WORDS).capitalize()}{i}",
+                "email": f"user{i}@example.com",
+                "password_hash": "x",
+                "role": role,
+                "is_approved": rng.random() < 0.95,
+                "profile_details": _sentence(rng, 20),
+                "created_at": epoch + timedelta(minutes=i),
+            })
+        _insert(conn, User, user_rows)
+
+        people = conn.execute(select(User.user_id, User.role)).all()
+        mentors = [uid for uid, role in people if role == UserRole.MENTOR]
+        members = [uid for uid, role in people if role == UserRole.MEMBER]
+        admins = [uid for uid, role in people if role == UserRole.ADMIN]
+
+        _insert(conn, Program, [
+            {"title": _sentence(rng, 4), "description": _sentence(rng, 30), "duration": "6 months",
+             "is_active": 1 if rng.random() < 0.8 else 0, "created_by": rng.choice(admins)}
+            for _ in range(50)
+        ])
+        program_ids = conn.scalars(select(Program.program_id)).all()
+
+        _insert(conn, Venture, [
+            {"member_id": member, "venture_name": _sentence(rng, 3), "description": _sentence(rng, 25)}
+            for member in members
+        ])
+        venture_ids = conn.scalars(select(Venture.venture_id)).all()
+
+        _insert(conn, Application, [
+            {"venture_id": venture, "program_id": rng.choice(program_ids), "status": rng.choice(list(ApplicationStatus))}
+            for venture in venture_ids if rng.random() < 0.5
+        ])
+        _insert(conn, Milestone, [
+            {"venture_id": venture, "title": _sentence(rng, 4), "status": rng.choice(list(MilestoneStatus))}
+            for venture in venture_ids for _ in range(3)
+        ])
+
+        pairs = {(rng.choice(mentors), member) for member in members for _ in range(2)}
+        _insert(conn, MentorMatch, [
+            {"mentor_id": mentor, "member_id": member, "status": rng.choice(list(MatchStatus))}
+            for mentor, member in pairs
+        ])
+
+        user_ids = [uid for uid, _ in people]
+        message_rows = []
+        conversations = {}
+        for i in range(messages):
+            sender, receiver = rng.sample(user_ids, 2)
+            sent_at = epoch + timedelta(seconds=i * 30)
+            pair = participants(sender, receiver)
+            conversations.setdefault(pair, [sent_at, sent_at])[1] = sent_at
+            message_rows.append({
+                "sender_id": sender, "receiver_id": receiver, "content": _sentence(rng, 12),
+                "sent_at": sent_at, "is_read": rng.random() < 0.9, "pair": pair,
+            })
+        _insert(conn, Conversation, [
+            {"user_low_id": low, "user_high_id": high, "created_at": first, "last_message_at": last}
+            for (low, high), (first, last) in conversations.items()
+        ])
+        conversation_ids = {
+            (low, high): conversation_id
+            for conversation_id, low, high in conn.execute(
+                select(Conversation.conversation_id, Conversation.user_low_id, Conversation.user_high_id)
+            )
+        }
+        for row in message_rows:
+            row["conversation_id"] = conversation_ids[row.pop("pair")]
+        _insert(conn, Message, message_rows)
+
+        _insert(conn, ResourceCategory, [{"category_name": f"Category {i}"} for i in range(20)])
+        category_ids = conn.scalars(select(ResourceCategory.category_id)).all()
+        _insert(conn, Resource, [
+            {"category_id": rng.choice(category_ids), "uploaded_by_id": rng.choice(mentors),
+             "title": _sentence(rng, 6), "description": _sentence(rng, 40),
+             "url": f"https://example.com/resources/{i}", "created_at": epoch + timedelta(minutes=i)}
+            for i in range(resources)
+        ])